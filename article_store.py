@@ -0,0 +1,395 @@
+import os
+import json
+import math
+import mmap
+import time
+import struct
+import sqlite3
+import hashlib
+
+
+class BloomFilter:
+    """On-disk, memory-mapped Bloom filter sized from an expected key count"""
+    
+    MAGIC = b'BLM1'
+    HEADER = struct.Struct('<4sQIQ')  # magic, num_bits, num_hashes, count
+    
+    def __init__(self, filename, expected_keys=100000, fp_rate=0.01):
+        self.filename = filename
+        
+        if not os.path.exists(filename):
+            num_bits, num_hashes = self.optimal_size(expected_keys, fp_rate)
+            with open(filename, 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, num_bits, num_hashes, 0))
+                f.truncate(self.HEADER.size + (num_bits + 7) // 8)
+        
+        self.file = open(filename, 'r+b')
+        self.mm = mmap.mmap(self.file.fileno(), 0)
+        magic, self.num_bits, self.num_hashes, self.count = self.HEADER.unpack_from(self.mm, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f"{filename} is not a Bloom filter file")
+    
+    @staticmethod
+    def optimal_size(expected_keys, fp_rate):
+        """Return (num_bits, num_hashes) for the expected key count and false-positive rate"""
+        expected_keys = max(1, expected_keys)
+        num_bits = int(math.ceil(-expected_keys * math.log(fp_rate) / (math.log(2) ** 2)))
+        num_hashes = max(1, int(round(num_bits / expected_keys * math.log(2))))
+        return num_bits, num_hashes
+    
+    def _bit_positions(self, key):
+        # Double hashing: two 64-bit halves of one blake2b digest generate all k positions
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+    
+    def add(self, key):
+        offset = self.HEADER.size
+        for position in self._bit_positions(key):
+            index = offset + position // 8
+            self.mm[index] = self.mm[index] | (1 << (position % 8))
+        self.count += 1
+    
+    def __contains__(self, key):
+        offset = self.HEADER.size
+        for position in self._bit_positions(key):
+            if not self.mm[offset + position // 8] & (1 << (position % 8)):
+                return False
+        return True
+    
+    def clear(self):
+        self.mm[self.HEADER.size:] = bytes(len(self.mm) - self.HEADER.size)
+        self.count = 0
+    
+    def size_bytes(self):
+        return len(self.mm)
+    
+    def flush(self):
+        self.HEADER.pack_into(self.mm, 0, self.MAGIC, self.num_bits, self.num_hashes, self.count)
+        self.mm.flush()
+    
+    def close(self):
+        self.flush()
+        self.mm.close()
+        self.file.close()
+
+
+class ProcessedArticleStore:
+    # Per-article pipeline stages; 'posted' articles move into processed_articles
+    STATE_FETCHED = 'fetched'
+    STATE_GENERATED = 'generated'
+    # Publish request was sent but may or may not have created the post
+    STATE_PUBLISH_UNKNOWN = 'publish_unknown'
+    # Why a key is in processed_articles: it was published, or skipped as a copy of another article
+    REASON_POSTED = 'posted'
+    REASON_DUPLICATE = 'duplicate'
+    
+    def __init__(self, db_file='processed_articles.db', legacy_json_file='processed_articles.json',
+                 bloom_file=None, bloom_expected_keys=100000, bloom_fp_rate=0.01):
+        self.db_file = db_file
+        self.legacy_json_file = legacy_json_file
+        
+        is_new_db = not os.path.exists(self.db_file)
+        # Stages are saved from whichever thread feeds generation; calls never overlap
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+        
+        # Optional Bloom filter in front of the exact store - a negative answer skips the DB lookup
+        self.bloom = None
+        self.bloom_stats = {'skipped': 0, 'checked': 0}
+        if bloom_file:
+            self.bloom = BloomFilter(bloom_file, bloom_expected_keys, bloom_fp_rate)
+            # A new filter, or keys added while the filter was disabled, means it must be refilled
+            if self.bloom.count != self.count():
+                self._rebuild_bloom()
+        
+        if is_new_db:
+            self.migrate_from_json(self.legacy_json_file)
+    
+    def _create_tables(self):
+        """Create the processed article and article state tables (key is the primary key index)"""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS processed_articles (
+                key TEXT PRIMARY KEY,
+                processed_at REAL NOT NULL,
+                reason TEXT NOT NULL DEFAULT 'posted'
+            ) WITHOUT ROWID
+        """)
+        # Stores created before keys had a reason
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(processed_articles)")]
+        if 'reason' not in columns:
+            self.conn.execute("ALTER TABLE processed_articles ADD COLUMN reason TEXT NOT NULL DEFAULT 'posted'")
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_processed_at ON processed_articles (processed_at)"
+        )
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS article_state (
+                key TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                article TEXT NOT NULL,
+                full_content TEXT,
+                blog_post TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+    
+    def migrate_from_json(self, json_file):
+        """Import keys from the old processed_articles.json list"""
+        try:
+            if not json_file or not os.path.exists(json_file):
+                return 0
+            with open(json_file, 'r', encoding='utf-8') as f:
+                keys = json.load(f)
+            added = self.add_many(keys)
+            print(f"[DEBUG] Migrated {added} processed article keys from {json_file}")
+            return added
+        except Exception as e:
+            print(f"Error migrating processed articles from {json_file}: {e}")
+            return 0
+    
+    def __contains__(self, key):
+        return self.contains(key)
+    
+    def __len__(self):
+        return self.count()
+    
+    def _rebuild_bloom(self):
+        """Refill the Bloom filter from the exact store"""
+        self.bloom.clear()
+        for (key,) in self.conn.execute("SELECT key FROM processed_articles"):
+            self.bloom.add(key)
+        self.bloom.flush()
+        print(f"[DEBUG] Built Bloom filter with {self.bloom.count} keys "
+              f"({self.bloom.size_bytes() // 1024} KB, {self.bloom.num_hashes} hashes)")
+    
+    def contains(self, key):
+        """Check whether an article key has been processed"""
+        if self.bloom is not None:
+            if key not in self.bloom:
+                self.bloom_stats['skipped'] += 1
+                return False
+            self.bloom_stats['checked'] += 1
+        
+        row = self.conn.execute(
+            "SELECT 1 FROM processed_articles WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None
+    
+    def add(self, key):
+        """Add a single processed article key"""
+        return self.add_many([key])
+    
+    def _insert_key(self, key, now, reason=REASON_POSTED):
+        """Insert one processed key inside the caller's transaction, returning True if it was new"""
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO processed_articles (key, processed_at, reason) VALUES (?, ?, ?)",
+            (key, now, reason)
+        )
+        if cursor.rowcount > 0:
+            # Only new keys go into the filter so its count matches the store
+            if self.bloom is not None:
+                self.bloom.add(key)
+            return True
+        return False
+    
+    def add_many(self, keys):
+        """Add processed article keys, returning how many were new"""
+        now = time.time()
+        added = 0
+        with self.conn:
+            for key in keys:
+                if self._insert_key(key, now):
+                    added += 1
+        
+        if self.bloom is not None:
+            self.bloom.flush()
+        
+        return added
+    
+    def save_stage(self, key, state, article, full_content=None, blog_post=None):
+        """Atomically record that an article completed a pipeline stage"""
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO article_state (key, state, article, full_content, blog_post, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    state = excluded.state,
+                    article = excluded.article,
+                    full_content = COALESCE(excluded.full_content, article_state.full_content),
+                    blog_post = COALESCE(excluded.blog_post, article_state.blog_post),
+                    updated_at = excluded.updated_at
+            """, (
+                key,
+                state,
+                json.dumps(article, ensure_ascii=False),
+                full_content,
+                json.dumps(blog_post, ensure_ascii=False) if blog_post is not None else None,
+                time.time()
+            ))
+    
+    def mark_posted(self, key, reason=REASON_POSTED):
+        """Atomically move a posted (or deliberately skipped) article from the state table into the processed keys"""
+        with self.conn:
+            self._insert_key(key, time.time(), reason)
+            self.conn.execute("DELETE FROM article_state WHERE key = ?", (key,))
+        
+        if self.bloom is not None:
+            self.bloom.flush()
+    
+    def record_failure(self, key):
+        """Count a failed attempt for an article that has not been posted yet"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE article_state SET attempts = attempts + 1, updated_at = ? WHERE key = ?",
+                (time.time(), key)
+            )
+    
+    def has_state(self, key):
+        """Check whether an article is in progress (or gave up) in the state table"""
+        row = self.conn.execute(
+            "SELECT 1 FROM article_state WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None
+    
+    def get_pending(self, max_attempts):
+        """Return unposted articles that can be resumed, oldest first"""
+        rows = self.conn.execute("""
+            SELECT key, state, article, full_content, blog_post, attempts
+            FROM article_state
+            WHERE attempts < ?
+            ORDER BY updated_at
+        """, (max_attempts,)).fetchall()
+        
+        pending = []
+        for key, state, article, full_content, blog_post, attempts in rows:
+            pending.append({
+                'key': key,
+                'state': state,
+                'article': json.loads(article),
+                'full_content': full_content,
+                'blog_post': json.loads(blog_post) if blog_post else None,
+                'attempts': attempts
+            })
+        return pending
+    
+    def prune(self, max_age_days):
+        """Delete keys older than max_age_days, returning how many were removed"""
+        cutoff = time.time() - max_age_days * 86400
+        cursor = self.conn.execute(
+            "DELETE FROM processed_articles WHERE processed_at < ?", (cutoff,)
+        )
+        self.conn.execute("DELETE FROM article_state WHERE updated_at < ?", (cutoff,))
+        self.conn.commit()
+        
+        # Bloom filters can't delete, so rebuild to keep pruned keys from turning into false positives
+        if self.bloom is not None and cursor.rowcount > 0:
+            self._rebuild_bloom()
+        
+        return cursor.rowcount
+    
+    def count(self, reason=None):
+        """Return the number of stored keys, optionally only those with the given reason"""
+        if reason is None:
+            return self.conn.execute("SELECT COUNT(*) FROM processed_articles").fetchone()[0]
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM processed_articles WHERE reason = ?", (reason,)
+        ).fetchone()[0]
+    
+    def close(self):
+        if self.bloom is not None:
+            self.bloom.close()
+        self.conn.close()
+
+
+def test_article_store():
+    """Test function for processed article store"""
+    import tempfile
+    
+    print("Testing processed article store...")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_file = os.path.join(tmp_dir, 'processed_articles.json')
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(["policyNewsView_1", "policyNewsView_2"], f)
+        
+        store = ProcessedArticleStore(os.path.join(tmp_dir, 'processed.db'), json_file)
+        print(f"Migrated keys: {store.count()} (should be 2)")
+        print(f"Contains policyNewsView_1: {'policyNewsView_1' in store}")
+        
+        store.add("stateCouncilView_3")
+        print(f"Contains stateCouncilView_3: {'stateCouncilView_3' in store}")
+        print(f"Pruned with 1 day TTL: {store.prune(1)} (should be 0)")
+        
+        # Article state: fetched -> generated -> posted
+        article = {'title': '테스트', 'link': 'http://example.com', 'key': 'policyNewsView_9'}
+        store.save_stage('policyNewsView_9', store.STATE_FETCHED, article, full_content='본문')
+        store.save_stage('policyNewsView_9', store.STATE_GENERATED, article, blog_post={'title': '제목'})
+        store.save_stage('policyNewsView_9', store.STATE_PUBLISH_UNKNOWN, article)
+        pending = store.get_pending(max_attempts=3)
+        print(f"Pending: {[(p['key'], p['state'], p['full_content'], p['blog_post']) for p in pending]}")
+        store.mark_posted('policyNewsView_9')
+        print(f"After posting - pending: {len(store.get_pending(3))}, processed: {'policyNewsView_9' in store}")
+        
+        print(f"Pruned with 0 day TTL: {store.prune(0)} (should be 4)")
+        store.close()
+        
+        # Same store with a Bloom filter in front
+        bloom_store = ProcessedArticleStore(
+            os.path.join(tmp_dir, 'processed.db'), None, bloom_file=os.path.join(tmp_dir, 'processed.bloom')
+        )
+        bloom_store.add("policyNewsView_4")
+        print(f"Bloom store contains policyNewsView_4: {'policyNewsView_4' in bloom_store}")
+        print(f"Bloom store contains policyNewsView_5: {'policyNewsView_5' in bloom_store}")
+        print(f"Bloom stats: {bloom_store.bloom_stats}")
+        bloom_store.close()
+    
+    print("\nProcessed article store test completed!")
+
+
+def benchmark_bloom_filter(key_counts=(10000, 100000, 500000), fp_rate=0.01):
+    """Benchmark Bloom filter false-positive rate, memory and lookup time vs a Python set"""
+    import tempfile
+    import tracemalloc
+    
+    print(f"Benchmarking Bloom filter (target false-positive rate: {fp_rate:.2%})...")
+    print(f"{'keys':>8} {'fp rate':>8} {'bloom':>10} {'set':>10} {'bloom us':>9} {'set us':>7}")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for count in key_counts:
+            keys = [f"policyNewsView_{148000000 + i}" for i in range(count)]
+            probes = [f"stateCouncilView_{i}" for i in range(count)]
+            
+            bloom = BloomFilter(os.path.join(tmp_dir, f"bloom_{count}.bin"), count, fp_rate)
+            for key in keys:
+                bloom.add(key)
+            
+            start_time = time.perf_counter()
+            false_positives = sum(1 for key in probes if key in bloom)
+            bloom_lookup = (time.perf_counter() - start_time) / count * 1e6
+            
+            tracemalloc.start()
+            key_set = set(f"policyNewsView_{148000000 + i}" for i in range(count))
+            set_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            
+            start_time = time.perf_counter()
+            sum(1 for key in probes if key in key_set)
+            set_lookup = (time.perf_counter() - start_time) / count * 1e6
+            
+            print(f"{count:>8} {false_positives / count:>8.2%} "
+                  f"{bloom.size_bytes() / 1024:>8.0f}KB {set_bytes / 1024:>8.0f}KB "
+                  f"{bloom_lookup:>9.2f} {set_lookup:>7.2f}")
+            bloom.close()
+
+
+if __name__ == "__main__":
+    import sys
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        benchmark_bloom_filter()
+    else:
+        test_article_store()
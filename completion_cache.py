@@ -0,0 +1,207 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+
+class CompletionCache:
+    def __init__(self, db_file='completion_cache.db', max_entries=500, max_bytes=50 * 1024 * 1024, max_age_days=30):
+        self.db_file = db_file
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0}
+        
+        # Generation may run outside the thread that created the cache
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                raw_response TEXT NOT NULL,
+                title TEXT NOT NULL,
+                body TEXT NOT NULL,
+                tags TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_completions_last_access ON completions (last_access)"
+        )
+        self.conn.commit()
+    
+    @staticmethod
+    def make_key(model, system_message, prompt, temperature, max_tokens):
+        """Hash everything that determines a completion into a cache key"""
+        payload = json.dumps({
+            'model': model,
+            'system': system_message,
+            'prompt': prompt,
+            'temperature': temperature,
+            'max_tokens': max_tokens
+        }, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        """Return the cached entry for a key, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT raw_response, title, body, tags, created_at FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row is None or time.time() - row[4] > self.max_age_days * 86400:
+                self.stats['misses'] += 1
+                return None
+            
+            self.conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+            self.stats['hits'] += 1
+        
+        raw_response, title, body, tags, _ = row
+        return {'raw_response': raw_response, 'title': title, 'body': body, 'tags': tags}
+    
+    def put(self, key, model, raw_response, title, body, tags):
+        """Store a completion and its parsed result, then evict if over limits"""
+        now = time.time()
+        size = len(raw_response.encode('utf-8'))
+        with self.lock:
+            with self.conn:
+                self.conn.execute("""
+                    INSERT OR REPLACE INTO completions
+                        (key, model, raw_response, title, body, tags, size, created_at, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (key, model, raw_response, title, body, tags, size, now, now))
+            self.stats['stores'] += 1
+        self.evict()
+    
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under the size limits"""
+        with self.lock:
+            with self.conn:
+                cutoff = time.time() - self.max_age_days * 86400
+                removed = self.conn.execute("DELETE FROM completions WHERE created_at < ?", (cutoff,)).rowcount
+                
+                count, total_bytes = self.conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+                ).fetchone()
+                
+                if count > self.max_entries or total_bytes > self.max_bytes:
+                    rows = self.conn.execute(
+                        "SELECT key, size FROM completions ORDER BY last_access"
+                    ).fetchall()
+                    for key, size in rows:
+                        if count <= self.max_entries and total_bytes <= self.max_bytes:
+                            break
+                        self.conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                        count -= 1
+                        total_bytes -= size
+                        removed += 1
+        return removed
+    
+    def entries(self):
+        """Return (key, model, title, size, created_at, last_access) for every entry, newest first"""
+        with self.lock:
+            return self.conn.execute("""
+                SELECT key, model, title, size, created_at, last_access
+                FROM completions ORDER BY created_at DESC
+            """).fetchall()
+    
+    def find(self, key_prefix):
+        """Return full entries whose key starts with the given prefix"""
+        with self.lock:
+            return self.conn.execute("""
+                SELECT key, model, raw_response, title, body, tags, created_at
+                FROM completions WHERE key LIKE ?
+            """, (key_prefix + '%',)).fetchall()
+    
+    def purge(self, key_prefix=None, older_than_days=None):
+        """Delete entries by key prefix and/or age; with no arguments delete everything"""
+        query = "DELETE FROM completions WHERE 1 = 1"
+        params = []
+        if key_prefix:
+            query += " AND key LIKE ?"
+            params.append(key_prefix + '%')
+        if older_than_days is not None:
+            query += " AND created_at < ?"
+            params.append(time.time() - older_than_days * 86400)
+        
+        with self.lock:
+            with self.conn:
+                return self.conn.execute(query, params).rowcount
+    
+    def close(self):
+        self.conn.close()
+
+
+def _format_time(timestamp):
+    return time.strftime('%Y-%m-%d %H:%M', time.localtime(timestamp))
+
+
+def main(argv):
+    """Inspect or purge the completion cache from the command line"""
+    usage = """Usage:
+  python completion_cache.py stats
+  python completion_cache.py list
+  python completion_cache.py show <key-prefix>
+  python completion_cache.py purge [--all | --older-than DAYS | <key-prefix>]"""
+    
+    if not argv:
+        print(usage)
+        return 1
+    
+    db_file = os.getenv('COMPLETION_CACHE_DB', 'completion_cache.db')
+    if not os.path.exists(db_file):
+        print(f"No completion cache at {db_file}")
+        return 1
+    
+    cache = CompletionCache(db_file)
+    command = argv[0]
+    
+    try:
+        if command == 'stats':
+            rows = cache.entries()
+            total_bytes = sum(row[3] for row in rows)
+            print(f"Entries: {len(rows)}")
+            print(f"Size: {total_bytes / 1024:.1f} KB (limit {cache.max_bytes / 1024 / 1024:.0f} MB, "
+                  f"{cache.max_entries} entries, {cache.max_age_days} days)")
+            if rows:
+                print(f"Oldest: {_format_time(min(row[4] for row in rows))}")
+                print(f"Newest: {_format_time(max(row[4] for row in rows))}")
+        elif command == 'list':
+            for key, model, title, size, created_at, last_access in cache.entries():
+                print(f"{key[:12]}  {model:<16} {size:>7}B  {_format_time(created_at)}  {title[:50]}")
+        elif command == 'show' and len(argv) > 1:
+            for key, model, raw_response, title, body, tags, created_at in cache.find(argv[1]):
+                print(f"=== {key} ({model}, {_format_time(created_at)}) ===")
+                print(f"Title: {title}")
+                print(f"Tags: {tags}")
+                print(f"--- raw response ---\n{raw_response}\n")
+        elif command == 'purge':
+            if len(argv) > 1 and argv[1] == '--all':
+                removed = cache.purge()
+            elif len(argv) > 2 and argv[1] == '--older-than':
+                removed = cache.purge(older_than_days=float(argv[2]))
+            elif len(argv) > 1:
+                removed = cache.purge(key_prefix=argv[1])
+            else:
+                print(usage)
+                return 1
+            print(f"Removed {removed} entries")
+        else:
+            print(usage)
+            return 1
+    finally:
+        cache.close()
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
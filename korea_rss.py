@@ -1,21 +1,206 @@
 import feedparser
 import requests
+from article_store import ProcessedArticleStore
+from near_duplicates import NearDuplicateIndex
 from bs4 import BeautifulSoup
 import re
 import json
 import os
+import time
+import threading
+import codecs
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from html import unescape
+from html.parser import HTMLParser as IncrementalHTMLParser
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from http.server import BaseHTTPRequestHandler
+from stub_server import start_stub_server
+
+# Fast C-based HTML parsers are optional; BeautifulSoup is always available as a fallback
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+
+try:
+    import lxml  # noqa: F401 - only used as a BeautifulSoup parser backend
+    BS4_PARSER = 'lxml'
+except ImportError:
+    BS4_PARSER = 'html.parser'
+
+
+class _ArticleStreamParser(IncrementalHTMLParser):
+    """Incremental parser that collects article text while the page downloads.
+    
+    Only simple selectors ('.class' or 'tag') are supported. Text is gathered
+    for every candidate container in parallel; `done` becomes True once the
+    preferred container has closed or has collected `max_chars` characters.
+    """
+    
+    def __init__(self, selectors, preferred_selector=None, max_chars=2000):
+        super().__init__(convert_charrefs=True)
+        self.selectors = [s for s in selectors if re.fullmatch(r'\.?[\w-]+', s)]
+        self.preferred_selector = preferred_selector
+        self.max_chars = max_chars
+        self.done = False
+        
+        self.candidates = {}  # selector -> {'tag', 'depth', 'parts', 'chars', 'closed'}
+        self.page_parts = []
+        self.skip_depth = 0  # inside <script>/<style>
+    
+    def _matches(self, selector, tag, attrs):
+        if selector.startswith('.'):
+            classes = (dict(attrs).get('class') or '').split()
+            return selector[1:] in classes
+        return tag == selector
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in ('script', 'style'):
+            self.skip_depth += 1
+            return
+        
+        for candidate in self.candidates.values():
+            if not candidate['closed'] and candidate['tag'] == tag:
+                candidate['depth'] += 1
+        
+        for selector in self.selectors:
+            # Like select_one, only the first element matching a selector counts
+            if selector not in self.candidates and self._matches(selector, tag, attrs):
+                self.candidates[selector] = {'tag': tag, 'depth': 1, 'parts': [], 'chars': 0, 'closed': False}
+    
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style'):
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        
+        for selector, candidate in self.candidates.items():
+            if not candidate['closed'] and candidate['tag'] == tag:
+                candidate['depth'] -= 1
+                if candidate['depth'] == 0:
+                    candidate['closed'] = True
+                    if selector == self.preferred_selector:
+                        self.done = True
+    
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        
+        self.page_parts.append(data)
+        text = data.strip()
+        if not text:
+            return
+        
+        for selector, candidate in self.candidates.items():
+            if not candidate['closed']:
+                candidate['parts'].append(text)
+                candidate['chars'] += len(text)
+                if selector == self.preferred_selector and candidate['chars'] >= self.max_chars:
+                    self.done = True
+    
+    def result(self):
+        """Return (text, matched_selector) using the same priority as the full cascade"""
+        order = list(self.selectors)
+        if self.preferred_selector in order:
+            order.remove(self.preferred_selector)
+            order.insert(0, self.preferred_selector)
+        
+        for selector in order:
+            candidate = self.candidates.get(selector)
+            if candidate:
+                text = ''.join(candidate['parts'])
+                if text:
+                    return text, selector
+                break
+        
+        return ''.join(self.page_parts), None
 
 
 class KoreaRSSManager:
-    def __init__(self):
+    def __init__(self, use_bloom_filter=False, detect_near_duplicates=True):
         # Korea.kr RSS feeds
         self.rss_feeds = [
             "https://www.korea.kr/rss/policy.xml",
             "https://www.korea.kr/rss/president.xml", 
             "https://www.korea.kr/rss/cabinet.xml"
         ]
-        self.processed_articles_file = 'processed_articles.json'
+        self.processed_articles_file = 'processed_articles.json'  # Legacy list, migrated into the store
+        self.processed_articles_db = 'processed_articles.db'
+        # Forget processed keys after this many days. Longer than the completion cache's 30 days on purpose:
+        # feeds can re-serve an old article at any time, while a cached completion is only needed until
+        # the article is posted (unposted articles resume from their saved state, not from the cache)
+        self.processed_ttl_days = 365
+        self.max_post_attempts = 3  # Give up resuming an unposted article after this many failures
+        # Optional on-disk Bloom filter in front of the store for very large key sets
+        # (use_bloom_filter=True); self.processed_store.bloom is None when it is off
+        self.bloom_filter_file = 'processed_articles.bloom'
+        self.bloom_expected_keys = 500000
+        self.processed_store = ProcessedArticleStore(
+            self.processed_articles_db,
+            self.processed_articles_file,
+            bloom_file=self.bloom_filter_file if use_bloom_filter else None,
+            bloom_expected_keys=self.bloom_expected_keys
+        )
+        
+        # Near-duplicate detection: the same announcement often appears in several feeds under different newsIds
+        # (detect_near_duplicates=False turns it off; self.near_duplicates is then None)
+        self.near_duplicates_db = 'near_duplicates.db'
+        self.near_duplicate_threshold = 0.6  # Estimated Jaccard similarity of title + description shingles
+        self.near_duplicate_ttl_days = 30
+        self.near_duplicate_min_chars = 50  # Too little text to compare reliably below this
+        self.near_duplicates = NearDuplicateIndex(
+            self.near_duplicates_db, threshold=self.near_duplicate_threshold
+        ) if detect_near_duplicates else None
+        
+        # Feed fetching settings
+        self.concurrent_fetch = True  # Download all feeds at once with a thread pool
+        self.max_fetch_workers = 8
+        self.feed_timeout = 10  # Per socket operation, so retries and slow trickles can exceed it
+        self.feed_deadline = 20  # Wall-clock limit per feed in seconds, retries included
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        }
+        
+        # HTML parser backend: 'selectolax' (fast, default when installed) or 'bs4'
+        self.parser_backend = 'selectolax' if HTMLParser is not None else 'bs4'
+        
+        # Korea.kr specific selectors for the article body, tried in order
+        self.content_selectors = [
+            '.article_body',
+            '.news_content',
+            '.cont_inner',
+            '.view_content',
+            '.article_view',
+            '.content_area',
+            '.news_view',
+            'article',
+            '.content'
+        ]
+        
+        # Learned content selector per page type (e.g. policyNewsView -> .article_body)
+        self.selector_cache_file = 'selector_cache.json'
+        self.selector_cache = self._load_selector_cache()
+        self.selector_cache_lock = threading.Lock()
+        self.selector_stats = {'hits': 0, 'misses': 0, 'queries': 0, 'pages': 0}
+        
+        # Streaming article download: read in chunks up to a byte cap and stop
+        # as soon as the article container has been parsed
+        self.stream_articles = False
+        self.max_article_bytes = 1024 * 1024
+        self.stream_chunk_size = 16 * 1024
+        # Upper bound on stored article text; the prompt builder fits it to its token budget
+        self.max_article_chars = 8000
+        
+        # Shared HTTP session (connection pooling, keep-alive, retries) for feeds and articles
+        self.max_retries = 3
+        self.retry_backoff = 0.5
+        self.session = self._create_session()
+        
+        # Conditional GET cache (ETag / Last-Modified + parsed entries per feed)
+        self.feed_cache_file = 'feed_cache.json'
+        self.feed_cache = self._load_feed_cache()
+        self.feed_cache_lock = threading.Lock()
+        self.feed_cache_stats = {'hits': 0, 'misses': 0, 'bytes_saved': 0}
     
     def _parse_article_key(self, link):
         """Parse article link to create unique key"""
@@ -32,8 +217,7 @@ class KoreaRSSManager:
             # https://www.korea.kr/news/healthView.do?newsId=148945548&call_from=rsslink
             
             # Extract page type (between last '/' and '.do')
-            page_type_match = re.search(r'/([^/]+)\.do', link)
-            page_type = page_type_match.group(1) if page_type_match else 'unknown'
+            page_type = self._parse_page_type(link)
             
             # Extract newsId (between 'newsId=' and '&' or end of string)
             news_id_match = re.search(r'newsId=(\d+)(?:&|$)', link)
@@ -51,56 +235,231 @@ class KoreaRSSManager:
             import hashlib
             return f"error_{hashlib.md5(link.encode()).hexdigest()[:8]}"
     
-    def _load_processed_articles(self):
-        """Load processed articles from file"""
+    def _parse_page_type(self, link):
+        """Extract page type (between last '/' and '.do') from an article link"""
+        page_type_match = re.search(r'/([^/]+)\.do', link)
+        return page_type_match.group(1) if page_type_match else 'unknown'
+    
+    def _load_selector_cache(self):
+        """Load learned content selectors per page type from file"""
+        try:
+            if os.path.exists(self.selector_cache_file):
+                with open(self.selector_cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            return {}
+        except Exception as e:
+            print(f"Error loading selector cache: {e}")
+            return {}
+    
+    def _save_selector_cache(self):
+        """Save learned content selectors per page type to file"""
+        try:
+            with open(self.selector_cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self.selector_cache, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"Error saving selector cache: {e}")
+    
+    def _record_selector(self, page_type, preferred_selector, matched_selector, queries):
+        """Update selector hit statistics and learn the selector that matched"""
+        with self.selector_cache_lock:
+            self.selector_stats['pages'] += 1
+            self.selector_stats['queries'] += queries
+            if preferred_selector and matched_selector == preferred_selector:
+                self.selector_stats['hits'] += 1
+            else:
+                self.selector_stats['misses'] += 1
+            
+            if matched_selector and self.selector_cache.get(page_type) != matched_selector:
+                print(f"[DEBUG] Learned content selector for {page_type}: {matched_selector}")
+                self.selector_cache[page_type] = matched_selector
+                self._save_selector_cache()
+    
+    def print_selector_stats(self):
+        """Print learned selector hit rate and DOM queries spent"""
+        stats = self.selector_stats
+        if not stats['pages']:
+            return
+        hit_rate = stats['hits'] / stats['pages'] * 100
+        print(f"[DEBUG] Content selector cache: {stats['hits']}/{stats['pages']} hits ({hit_rate:.0f}%), "
+              f"{stats['queries']} DOM queries ({stats['queries'] / stats['pages']:.1f}/page)")
+    
+    def _create_session(self):
+        """Create a pooled requests session with bounded retry and backoff"""
+        session = requests.Session()
+        session.headers.update(self.headers)
+        
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=self.retry_backoff,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=['GET', 'HEAD'],
+            respect_retry_after_header=True
+        )
+        # Pool must be at least as large as the feed thread pool so workers don't block
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=max(10, self.max_fetch_workers),
+            max_retries=retry
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def _load_feed_cache(self):
+        """Load per-feed conditional GET cache from file"""
         try:
-            if os.path.exists(self.processed_articles_file):
-                with open(self.processed_articles_file, 'r', encoding='utf-8') as f:
-                    return set(json.load(f))
-            return set()
+            if os.path.exists(self.feed_cache_file):
+                with open(self.feed_cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            return {}
         except Exception as e:
-            print(f"Error loading processed articles: {e}")
-            return set()
+            print(f"Error loading feed cache: {e}")
+            return {}
     
-    def _save_processed_articles(self, processed_keys):
-        """Save processed article keys to file"""
+    def _save_feed_cache(self):
+        """Save per-feed conditional GET cache to file"""
         try:
-            with open(self.processed_articles_file, 'w', encoding='utf-8') as f:
-                json.dump(list(processed_keys), f, ensure_ascii=False, indent=2)
+            with open(self.feed_cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self.feed_cache, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"Error saving feed cache: {e}")
+    
+    def _entry_to_dict(self, entry):
+        """Convert a feedparser entry to a plain dict that can be cached as JSON"""
+        published = entry.get('published_parsed')
+        return {
+            'title': entry.get('title', ''),
+            'description': entry.get('description', ''),
+            'link': entry.get('link', ''),
+            'published': list(published)[:6] if published else []
+        }
+    
+    def _sort_entries(self, entries):
+        """Sort feed entries by publish date (newest first), keeping feed order for ties"""
+        # sorted() is stable, so entries without a date keep their original relative order
+        return sorted(entries, key=lambda entry: entry['published'], reverse=True)
+    
+    def _fetch_feed(self, rss_url):
+        """Download and parse a single RSS feed, returning its entries"""
+        try:
+            print(f"[DEBUG] Fetching from RSS: {rss_url}")
+            
+            # feedparser only sends etag=/modified= when it downloads the feed itself,
+            # so the equivalent conditional headers are sent with our own request
+            cached = self.feed_cache.get(rss_url)
+            headers = {}
+            if cached:
+                if cached.get('etag'):
+                    headers['If-None-Match'] = cached['etag']
+                if cached.get('modified'):
+                    headers['If-Modified-Since'] = cached['modified']
+            
+            response = self.session.get(rss_url, headers=headers, timeout=self.feed_timeout)
+            
+            if response.status_code == 304 and cached:
+                print(f"[DEBUG] Feed not modified, using cached entries: {rss_url}")
+                with self.feed_cache_lock:
+                    self.feed_cache_stats['hits'] += 1
+                    self.feed_cache_stats['bytes_saved'] += cached.get('size', 0)
+                return cached['entries']
+            
+            response.raise_for_status()
+            
+            feed = feedparser.parse(response.content)
+            entries = self._sort_entries([self._entry_to_dict(entry) for entry in feed.entries])
+            
+            with self.feed_cache_lock:
+                self.feed_cache_stats['misses'] += 1
+                self.feed_cache[rss_url] = {
+                    'etag': response.headers.get('ETag'),
+                    'modified': response.headers.get('Last-Modified'),
+                    'size': len(response.content),
+                    'entries': entries
+                }
+            return entries
         except Exception as e:
-            print(f"Error saving processed articles: {e}")
+            print(f"Error fetching RSS feed {rss_url}: {e}")
+            return []
+    
+    def _fetch_all_feeds(self):
+        """Fetch all RSS feeds and return (rss_url, entries) pairs in feed order"""
+        start_time = time.time()
+        self.feed_cache_stats = {'hits': 0, 'misses': 0, 'bytes_saved': 0}
+        
+        # One worker fetches the feeds one after another
+        workers = min(self.max_fetch_workers, len(self.rss_feeds)) if self.concurrent_fetch else 1
+        executor = ThreadPoolExecutor(max_workers=max(workers, 1))
+        futures = [executor.submit(self._fetch_feed, rss_url) for rss_url in self.rss_feeds]
+        results = []
+        for i, (rss_url, future) in enumerate(zip(self.rss_feeds, futures)):
+            # Feeds beyond the pool size start once earlier ones finish, so their deadline is later
+            deadline = start_time + self.feed_deadline * (i // max(workers, 1) + 1)
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.time())))
+            except FutureTimeoutError:
+                print(f"Error fetching RSS feed {rss_url}: no result within {self.feed_deadline}s, skipping it")
+                results.append([])
+        # Don't wait for stalled fetches; they end on their own once the socket timeout and retries run out
+        executor.shutdown(wait=False, cancel_futures=True)
+        
+        print(f"[DEBUG] Fetched {len(self.rss_feeds)} feeds in {time.time() - start_time:.2f}s "
+              f"(concurrent: {self.concurrent_fetch})")
+        print(f"[DEBUG] Feed cache: {self.feed_cache_stats['hits']} hits, "
+              f"{self.feed_cache_stats['misses']} misses, "
+              f"{self.feed_cache_stats['bytes_saved']} bytes saved")
+        
+        if self.feed_cache_stats['misses']:
+            self._save_feed_cache()
+        return list(zip(self.rss_feeds, results))
     
     def get_rss_articles(self, num_articles=5):
-        """Get articles from Korea.kr RSS feeds with duplicate checking"""
+        """Get articles from Korea.kr RSS feeds with duplicate checking.
+        
+        Articles left unposted by earlier runs come first, carrying their saved
+        'state', 'full_content' and 'blog_post' so they resume from the last
+        completed stage. Keys are only marked processed once posted.
+        """
         try:
-            # Load processed articles
-            processed_keys = self._load_processed_articles()
-            print(f"[DEBUG] Loaded {len(processed_keys)} processed article keys")
+            # Drop expired keys and report store size
+            pruned = self.processed_store.prune(self.processed_ttl_days)
+            print(f"[DEBUG] Processed article store has {self.processed_store.count()} keys "
+                  f"({self.processed_store.count(self.processed_store.REASON_DUPLICATE)} near-duplicates, "
+                  f"{pruned} expired keys pruned)")
+            if self.near_duplicates is not None:
+                self.near_duplicates.prune(self.near_duplicate_ttl_days)
             
             all_articles = []
-            new_processed_keys = processed_keys.copy()
+            selected_keys = set()
             
-            for rss_url in self.rss_feeds:
-                print(f"[DEBUG] Fetching from RSS: {rss_url}")
-                
-                feed = feedparser.parse(rss_url)
-                
-                for entry in feed.entries:
+            # Resume unposted articles from earlier runs
+            for pending in self.processed_store.get_pending(self.max_post_attempts)[:num_articles]:
+                article_data = pending['article']
+                article_data['state'] = pending['state']
+                article_data['full_content'] = pending['full_content']
+                article_data['blog_post'] = pending['blog_post']
+                all_articles.append(article_data)
+                selected_keys.add(pending['key'])
+                print(f"[DEBUG] Resuming article at stage '{pending['state']}' "
+                      f"(attempt {pending['attempts'] + 1}): {article_data['title'][:50]}...")
+            
+            feeds = self._fetch_all_feeds() if len(all_articles) < num_articles else []
+            for rss_url, entries in feeds:
+                for entry in entries:
                     if len(all_articles) >= num_articles:
                         break
                         
                     # Extract title (remove CDATA)
-                    title = entry.title
+                    title = entry['title']
                     if title.startswith('<![CDATA[') and title.endswith(']]>'):
                         title = title[9:-3].strip()
                     
                     # Extract description and clean HTML
-                    description = entry.description if hasattr(entry, 'description') else ''
+                    description = entry['description']
                     if description.startswith('<![CDATA[') and description.endswith(']]>'):
                         description = description[9:-3].strip()
                     
                     # Extract link
-                    link = entry.link if hasattr(entry, 'link') else ''
+                    link = entry['link']
                     if link.startswith('<![CDATA[') and link.endswith(']]>'):
                         link = link[9:-3].strip()
                     
@@ -108,33 +467,51 @@ class KoreaRSSManager:
                     article_key = self._parse_article_key(link)
                     print(f"[DEBUG] Article key: {article_key}")
                     
-                    # Check if already processed
-                    if article_key in processed_keys:
+                    # Check if already processed or already in progress from an earlier run
+                    if (article_key in selected_keys or article_key in self.processed_store
+                            or self.processed_store.has_state(article_key)):
                         print(f"[DEBUG] Skipping duplicate article: {title[:50]}... (key: {article_key})")
                         continue
                     
                     # Clean description from HTML tags
                     clean_description = self.clean_html_content(description)
                     
+                    # Skip republished copies of an article selected now or in an earlier run
+                    if self.near_duplicates is not None and len(clean_description) >= self.near_duplicate_min_chars:
+                        signature = self.near_duplicates.signature(f"{title}\n{clean_description}")
+                        # An article selected by an earlier run that never got posted must not match itself
+                        duplicate = self.near_duplicates.find_duplicate(signature, exclude_key=article_key)
+                        if duplicate:
+                            print(f"[DEBUG] Skipping near-duplicate article: {title[:50]}... "
+                                  f"(similar to {duplicate[0]}, {duplicate[1]:.2f})")
+                            # Recorded so later runs skip it on the key check without comparing it again
+                            self.processed_store.mark_posted(article_key, self.processed_store.REASON_DUPLICATE)
+                            continue
+                        self.near_duplicates.add(article_key, signature, title)
+                    
                     article_data = {
                         'title': title,
                         'description': clean_description,
                         'link': link,
                         'source': rss_url,
-                        'key': article_key
+                        'key': article_key,
+                        'state': None
                     }
                     
                     all_articles.append(article_data)
-                    new_processed_keys.add(article_key)
+                    selected_keys.add(article_key)
                     print(f"[DEBUG] Added new article: {title[:50]}... (key: {article_key})")
                 
                 if len(all_articles) >= num_articles:
                     break
             
-            # Save updated processed keys
-            if new_processed_keys != processed_keys:
-                self._save_processed_articles(new_processed_keys)
-                print(f"[DEBUG] Saved {len(new_processed_keys)} processed article keys")
+            if self.near_duplicates is not None:
+                print(f"[DEBUG] Near-duplicate index: {self.near_duplicates.stats['duplicates']} duplicates skipped, "
+                      f"{self.near_duplicates.count()} articles indexed")
+            
+            if self.processed_store.bloom is not None:
+                print(f"[DEBUG] Bloom filter: {self.processed_store.bloom_stats['skipped']} lookups skipped, "
+                      f"{self.processed_store.bloom_stats['checked']} checked against the store")
             
             return all_articles[:num_articles]
             
@@ -142,18 +519,86 @@ class KoreaRSSManager:
             print(f"Error fetching RSS feeds: {e}")
             return []
     
+    def _html_to_text(self, html_content, remove_tags):
+        """Extract all text from HTML after removing the given tags"""
+        if self.parser_backend == 'selectolax':
+            tree = HTMLParser(html_content)
+            tree.strip_tags(remove_tags)
+            root = tree.body or tree.root
+            return root.text() if root else ''
+        
+        soup = BeautifulSoup(html_content, BS4_PARSER)
+        for element in soup(remove_tags):
+            element.decompose()
+        return soup.get_text()
+    
+    def _extract_article_text(self, html_content, preferred_selector=None):
+        """Extract article body text using the content selectors.
+        
+        preferred_selector (the one learned for this page type) is tried first,
+        then the full cascade. Returns (text, matched_selector, queries);
+        matched_selector is None when the whole page text was used. Only the
+        first matching selector is used - if its text is empty the whole page
+        text is returned instead.
+        """
+        selectors = list(self.content_selectors)
+        if preferred_selector:
+            selectors = [preferred_selector] + [s for s in selectors if s != preferred_selector]
+        
+        queries = 0
+        if self.parser_backend == 'selectolax':
+            # Bytes are parsed as UTF-8, which is what korea.kr serves
+            tree = HTMLParser(html_content)
+            tree.strip_tags(['script', 'style'])
+            
+            for selector in selectors:
+                queries += 1
+                node = tree.css_first(selector)
+                if node is not None:
+                    text = node.text(separator='', strip=True)
+                    if text:
+                        return text, selector, queries
+                    break
+            
+            root = tree.body or tree.root
+            return (root.text() if root else ''), None, queries
+        
+        soup = BeautifulSoup(html_content, BS4_PARSER)
+        for element in soup(['script', 'style']):
+            element.decompose()
+        
+        for selector in selectors:
+            queries += 1
+            element = soup.select_one(selector)
+            if element is not None:
+                text = element.get_text(strip=True)
+                if text:
+                    return text, selector, queries
+                break
+        
+        return soup.get_text(), None, queries
+    
+    def _clean_article_text(self, content):
+        """Drop very short lines and limit article text length"""
+        lines = content.split('\n')
+        cleaned_lines = []
+        for line in lines:
+            line = line.strip()
+            if line and len(line) > 10:  # Filter out very short lines
+                cleaned_lines.append(line)
+        
+        # Limit content length
+        content = ' '.join(cleaned_lines)
+        if len(content) > self.max_article_chars:
+            content = content[:self.max_article_chars] + "..."
+        
+        return content
+    
     def clean_html_content(self, html_content):
         """Clean HTML content and extract meaningful text"""
         try:
-            # Parse HTML
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Remove unwanted elements
-            for element in soup(['img', 'a', 'script', 'style']):
-                element.decompose()
-            
-            # Get text content
-            text = soup.get_text()
+            # Get text content without images, links, scripts and styles
+            text = self._html_to_text(html_content, ['img', 'a', 'script', 'style'])
             
             # Clean up text
             text = re.sub(r'\s+', ' ', text)  # Replace multiple spaces with single space
@@ -161,70 +606,68 @@ class KoreaRSSManager:
             text = unescape(text)  # Decode HTML entities
             text = text.strip()
             
-            # Limit length
-            if len(text) > 1500:
-                text = text[:1500] + "..."
-            
+            # No length cut here - the prompt token budget trims news at sentence boundaries
             return text
             
         except Exception as e:
             print(f"Error cleaning HTML content: {e}")
             return html_content
     
-    def get_full_article_content(self, url):
-        """Get full content from an article URL"""
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
+    def _stream_article_text(self, url, preferred_selector=None):
+        """Download an article in chunks and extract its text incrementally.
+        
+        Stops reading once the preferred container has closed or enough text was
+        collected, or when max_article_bytes is reached. Returns
+        (text, matched_selector, bytes_read).
+        """
+        parser = _ArticleStreamParser(self.content_selectors, preferred_selector, self.max_article_chars)
+        bytes_read = 0
+        
+        with self.session.get(url, timeout=10, stream=True) as response:
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Try to find article content with Korea.kr specific selectors
-            content_selectors = [
-                '.article_body',
-                '.news_content',
-                '.cont_inner',
-                '.view_content',
-                '.article_view',
-                '.content_area',
-                '.news_view',
-                'article',
-                '.content'
-            ]
-            
-            content = ""
-            for selector in content_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    content = elements[0].get_text(strip=True)
+            # requests assumes ISO-8859-1 for text/* without a charset, korea.kr pages are UTF-8
+            content_type = response.headers.get('Content-Type', '')
+            encoding = response.encoding if 'charset' in content_type.lower() else 'utf-8'
+            decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+            
+            for chunk in response.iter_content(chunk_size=self.stream_chunk_size):
+                bytes_read += len(chunk)
+                parser.feed(decoder.decode(chunk))
+                if parser.done:
                     break
+                if bytes_read >= self.max_article_bytes:
+                    print(f"[DEBUG] Article download capped at {bytes_read} bytes: {url}")
+                    break
+            parser.feed(decoder.decode(b'', final=True))
+        
+        # HTMLParser holds back trailing text until it sees the next tag; close() flushes it
+        parser.close()
+        text, matched_selector = parser.result()
+        print(f"[DEBUG] Streamed {bytes_read} bytes (early exit: {parser.done}) from {url}")
+        return text, matched_selector, bytes_read
+    
+    def get_full_article_content(self, url):
+        """Get full content from an article URL"""
+        try:
+            page_type = self._parse_page_type(url)
+            preferred_selector = self.selector_cache.get(page_type)
             
-            # If no specific content found, try body text
-            if not content:
-                content = soup.get_text()
+            if self.stream_articles:
+                content, matched_selector, _ = self._stream_article_text(url, preferred_selector)
+                # The streaming parser makes no DOM queries
+                self._record_selector(page_type, preferred_selector, matched_selector, 0)
+                return self._clean_article_text(content)
             
-            # Clean up the content
-            lines = content.split('\n')
-            cleaned_lines = []
-            for line in lines:
-                line = line.strip()
-                if line and len(line) > 10:  # Filter out very short lines
-                    cleaned_lines.append(line)
+            response = self.session.get(url, timeout=10)
+            response.raise_for_status()
             
-            # Limit content length
-            content = ' '.join(cleaned_lines)
-            if len(content) > 2000:
-                content = content[:2000] + "..."
+            # Try the selector learned for this page type first, then the Korea.kr
+            # specific selectors, falling back to the whole page text
+            content, matched_selector, queries = self._extract_article_text(response.content, preferred_selector)
+            self._record_selector(page_type, preferred_selector, matched_selector, queries)
             
-            return content
+            return self._clean_article_text(content)
         except Exception as e:
             print(f"Error fetching content from {url}: {e}")
             return ""
@@ -266,5 +709,192 @@ def test_korea_rss():
     print("\nKorea RSS test completed!")
 
 
+class _StubFeedHandler(BaseHTTPRequestHandler):
+    """Serves a small RSS document after a fixed delay to simulate network latency"""
+    delay = 0.3
+    
+    def do_GET(self):
+        time.sleep(self.delay)
+        items = ''.join(
+            f"<item><title>Stub {self.path} {i}</title>"
+            f"<link>http://localhost/news/policyNewsView.do?newsId={i}</link>"
+            f"<description>stub article {i}</description></item>"
+            for i in range(10)
+        )
+        body = f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>stub</title>{items}</channel></rss>'.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class _StubArticleHandler(BaseHTTPRequestHandler):
+    """Serves a fixed article page over HTTP/1.1 so keep-alive can be measured"""
+    protocol_version = 'HTTP/1.1'
+    # Send headers and body in one segment - separate small writes hit Nagle / delayed ACK
+    # stalls on a reused connection and would hide the keep-alive gain
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+    
+    def do_GET(self):
+        paragraphs = ''.join(f"<p>정책 브리핑 본문 문단 {i} 입니다. 테스트용 기사 내용입니다.</p>" for i in range(50))
+        body = f'<html><body><div class="article_body">{paragraphs}</div></body></html>'.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def benchmark_article_fetch(num_requests=50):
+    """Benchmark bare requests.get vs the pooled session for article downloads"""
+    print(f"Benchmarking article fetch ({num_requests} requests)...")
+    
+    server, base_url = start_stub_server(_StubArticleHandler)
+    rss_manager = KoreaRSSManager()
+    urls = [f"{base_url}/news/policyNewsView.do?newsId={i}" for i in range(num_requests)]
+    
+    try:
+        start_time = time.perf_counter()
+        for url in urls:
+            requests.get(url, headers=rss_manager.headers, timeout=10).content
+        bare_time = time.perf_counter() - start_time
+        
+        start_time = time.perf_counter()
+        for url in urls:
+            rss_manager.session.get(url, timeout=10).content
+        session_time = time.perf_counter() - start_time
+        
+        print(f"Bare requests.get: {bare_time / num_requests * 1000:.2f} ms/article")
+        print(f"Pooled session:    {session_time / num_requests * 1000:.2f} ms/article")
+    finally:
+        server.shutdown()
+
+
+def save_article_corpus(corpus_dir='article_corpus', num_articles=20):
+    """Save current korea.kr article pages to disk for parser benchmarks"""
+    os.makedirs(corpus_dir, exist_ok=True)
+    rss_manager = KoreaRSSManager()
+    
+    saved = 0
+    for rss_url, entries in rss_manager._fetch_all_feeds():
+        for entry in entries:
+            if saved >= num_articles:
+                return saved
+            link = entry['link']
+            if not link:
+                continue
+            try:
+                response = rss_manager.session.get(link, timeout=10)
+                response.raise_for_status()
+                filename = f"{rss_manager._parse_article_key(link)}.html"
+                with open(os.path.join(corpus_dir, filename), 'wb') as f:
+                    f.write(response.content)
+                saved += 1
+            except Exception as e:
+                print(f"Error saving {link}: {e}")
+    return saved
+
+
+def _run_parser_benchmark(backend, pages, rounds, result_queue):
+    """Parse and extract every page with one backend (runs in a child process)"""
+    import resource
+    
+    rss_manager = KoreaRSSManager()
+    rss_manager.parser_backend = backend
+    
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            content, _, _ = rss_manager._extract_article_text(page)
+            rss_manager._clean_article_text(content)
+    elapsed = time.perf_counter() - start_time
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    
+    # ru_maxrss is in kilobytes on Linux
+    result_queue.put((elapsed, rss_after - rss_before))
+
+
+def benchmark_html_parsers(corpus_dir='article_corpus', rounds=5):
+    """Compare parse-and-extract time and peak memory of the HTML parser backends"""
+    import multiprocessing
+    
+    if not os.path.isdir(corpus_dir) or not os.listdir(corpus_dir):
+        print(f"Corpus {corpus_dir} is empty, downloading article pages...")
+        save_article_corpus(corpus_dir)
+    
+    pages = []
+    for filename in sorted(os.listdir(corpus_dir)):
+        if filename.endswith('.html'):
+            with open(os.path.join(corpus_dir, filename), 'rb') as f:
+                pages.append(f.read())
+    
+    if not pages:
+        print("No pages in corpus, skipping parser benchmark")
+        return
+    
+    backends = ['bs4']
+    if HTMLParser is not None:
+        backends.insert(0, 'selectolax')
+    
+    print(f"Benchmarking HTML parsers on {len(pages)} pages x {rounds} rounds "
+          f"(bs4 parser: {BS4_PARSER})...")
+    print(f"{'backend':>12} {'ms/page':>10} {'peak RSS delta':>16}")
+    for backend in backends:
+        # Each backend runs in a fresh process so peak memory is not shared
+        result_queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=_run_parser_benchmark, args=(backend, pages, rounds, result_queue)
+        )
+        process.start()
+        elapsed, peak_kb = result_queue.get()
+        process.join()
+        print(f"{backend:>12} {elapsed / (len(pages) * rounds) * 1000:>9.2f} {peak_kb / 1024:>13.1f} MB")
+
+
+def benchmark_feed_fetch(feed_counts=(1, 3, 6, 12, 24)):
+    """Benchmark sequential vs concurrent feed fetching against a local stub server"""
+    print(f"Benchmarking feed fetch (stub delay: {_StubFeedHandler.delay}s per feed)...")
+    
+    server, base_url = start_stub_server(_StubFeedHandler)
+    rss_manager = KoreaRSSManager()
+    # Keep stub feeds out of the real conditional GET cache
+    rss_manager.feed_cache = {}
+    rss_manager.feed_cache_file = os.devnull
+    
+    try:
+        print(f"{'feeds':>6} {'sequential':>12} {'concurrent':>12} {'speedup':>8}")
+        for count in feed_counts:
+            rss_manager.rss_feeds = [f"{base_url}/feed{i}.xml" for i in range(count)]
+            
+            timings = {}
+            for concurrent in (False, True):
+                rss_manager.concurrent_fetch = concurrent
+                start_time = time.perf_counter()
+                rss_manager._fetch_all_feeds()
+                timings[concurrent] = time.perf_counter() - start_time
+            
+            speedup = timings[False] / timings[True] if timings[True] else 0
+            print(f"{count:>6} {timings[False]:>11.2f}s {timings[True]:>11.2f}s {speedup:>7.1f}x")
+    finally:
+        server.shutdown()
+
+
 if __name__ == "__main__":
-    test_korea_rss()
\ No newline at end of file
+    import sys
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        benchmark_feed_fetch()
+        benchmark_article_fetch()
+    elif len(sys.argv) > 1 and sys.argv[1] == "bench-parser":
+        benchmark_html_parsers()
+    else:
+        test_korea_rss()
\ No newline at end of file
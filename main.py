@@ -1,5 +1,9 @@
 import os
 import json
+import time
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from korea_rss import KoreaRSSManager
 from openai_blog import OpenAIBlogGenerator
@@ -13,11 +17,193 @@ load_dotenv()
 class TistoryAutoBlog:
     def __init__(self):
         self.max_articles = 1
+        self.prefetch_workers = 5
+        # 'async' generates posts immediately; 'batch' uses the cheaper OpenAI Batch API,
+        # and posts whose batch hasn't finished are picked up by a later run
+        self.generation_mode = 'async'
         
         # Initialize components
         self.rss_manager = KoreaRSSManager()
         self.blog_generator = OpenAIBlogGenerator()
         self.tistory_poster = TistoryPoster()
+        self.article_store = self.rss_manager.processed_store
+        # Stages that already have a generated blog post and only need publishing
+        self.resumable_states = (self.article_store.STATE_GENERATED, self.article_store.STATE_PUBLISH_UNKNOWN)
+        
+        # Background browser launch (see _start_browser)
+        self.browser_lock = threading.Lock()
+        self.browser_driver = None
+        self.browser_discarded = False
+        self.browser_started = threading.Event()  # Chrome is up (or failed to start)
+        self.browser_start_timeout = 60  # How long a discard waits for Chrome to come up so it can be quit
+    
+    def _fetch_article_content(self, article_data):
+        """Get full article content, falling back to the RSS description"""
+        if article_data.get('full_content'):
+            print(f"Using saved full content from previous run: {article_data['link']}")
+            return article_data['full_content']
+        
+        full_content = ""
+        if article_data['link']:
+            print(f"Fetching full content from: {article_data['link']}")
+            full_content = self.rss_manager.get_full_article_content(article_data['link'])
+            if full_content:
+                print(f"Full content fetched: {len(full_content)} characters")
+            else:
+                print("Failed to fetch full content, using description")
+                full_content = article_data['description']
+        else:
+            full_content = article_data['description']
+        return full_content
+    
+    def _start_prefetch(self, articles):
+        """Fetch every article's full content concurrently; results arrive on the returned queue"""
+        results = queue.Queue()
+        
+        def fetch(article_data):
+            try:
+                full_content = self._fetch_article_content(article_data)
+            except Exception as e:
+                print(f"Error prefetching {article_data['link']}: {e}")
+                full_content = article_data['description']
+            results.put((article_data, full_content))
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.prefetch_workers, len(articles))))
+        for article_data in articles:
+            executor.submit(fetch, article_data)
+        # Don't block here - workers keep running while the browser starts up
+        executor.shutdown(wait=False)
+        
+        print(f"Prefetching full content for {len(articles)} articles in background")
+        return results
+    
+    def _start_browser(self):
+        """Launch Chrome and log in to Tistory in a background daemon thread.
+        
+        Returns a future of (driver, login_success), so the browser cold start
+        overlaps with RSS fetching and blog generation. The thread is a daemon, so
+        a slow login (e.g. waiting for 2FA) never keeps the process alive;
+        _discard_browser quits the driver when nothing will be posted.
+        """
+        browser_future = Future()
+        self.browser_driver = None
+        self.browser_discarded = False
+        self.browser_started.clear()
+        
+        def launch():
+            start_time = time.time()
+            try:
+                try:
+                    driver = self.tistory_poster.setup_chrome_driver()
+                except Exception:
+                    self.browser_started.set()
+                    raise
+                with self.browser_lock:
+                    self.browser_driver = driver
+                    discarded = self.browser_discarded
+                if discarded:
+                    driver.quit()
+                    self.browser_started.set()
+                    browser_future.set_result((None, False))
+                    return
+                self.browser_started.set()
+                login_success = self.tistory_poster.login_to_tistory(driver)
+            except Exception as e:
+                # A driver quit by _discard_browser mid-login ends up here as well
+                with self.browser_lock:
+                    driver, discarded = self.browser_driver, self.browser_discarded
+                    self.browser_driver = None
+                if driver and not discarded:
+                    driver.quit()
+                browser_future.set_exception(e)
+                return
+            print(f"Browser ready in background after {time.time() - start_time:.1f}s (logged in: {login_success})")
+            browser_future.set_result((driver, login_success))
+        
+        threading.Thread(target=launch, daemon=True).start()
+        print("Launching browser and logging in to Tistory in background")
+        return browser_future
+    
+    def _wait_for_browser(self, browser_future):
+        """Wait for the background browser launch and report how much of it was not hidden"""
+        start_time = time.time()
+        driver, login_success = browser_future.result()
+        print(f"Waited {time.time() - start_time:.1f}s for the browser after generation")
+        return driver, login_success
+    
+    def _discard_browser(self):
+        """Stop the background browser when there turned out to be nothing to post.
+        
+        Quits the driver right away, even in the middle of the login. If Chrome is still
+        starting, the launch thread quits it once it is up; that is waited for (at most
+        browser_start_timeout) so the process never exits leaving Chrome behind.
+        """
+        with self.browser_lock:
+            self.browser_discarded = True
+            driver = self.browser_driver
+        if not driver:
+            self.browser_started.wait(self.browser_start_timeout)
+        else:
+            try:
+                driver.quit()
+                print("Closed the background browser - nothing to post")
+            except Exception as e:
+                print(f"Error closing background browser: {e}")
+    
+    def _save_stage(self, article_data, state, full_content=None, blog_post=None):
+        """Record that an article completed a pipeline stage so a later run can resume it"""
+        article = {k: v for k, v in article_data.items() if k not in ('state', 'full_content', 'blog_post')}
+        self.article_store.save_stage(article_data['key'], state, article, full_content, blog_post)
+        article_data['state'] = state
+    
+    def _prepare_generation_input(self, article_data, full_content):
+        """Prepare keyword data and news contents for blog generation"""
+        keyword_data = {
+            'keyword': article_data['title'],
+            'source_url': article_data['link']
+        }
+        news_contents = [full_content] if full_content else []
+        return keyword_data, news_contents
+    
+    def _generate_blog_posts(self, articles, prefetch_queue, use_openai=True):
+        """Generate all missing blog posts, each one starting as soon as its article content is prefetched"""
+        prepared = []
+        to_generate = []
+        
+        def prefetched_items():
+            # Advanced by the generator while earlier posts are already generating
+            for _ in range(len(articles)):
+                article_data, full_content = prefetch_queue.get()
+                if not article_data['state']:
+                    self._save_stage(article_data, self.article_store.STATE_FETCHED, full_content=full_content)
+                prepared.append(article_data)
+                
+                if article_data['state'] in self.resumable_states and article_data.get('blog_post'):
+                    # Resume: the blog post was generated by a previous run that failed to post
+                    print(f"Using blog post generated in previous run: {article_data['blog_post']['title']}")
+                    continue
+                to_generate.append(article_data)
+                yield self._prepare_generation_input(article_data, full_content)
+        
+        if self.generation_mode == 'batch' and use_openai:
+            # A batch is submitted in one go, so it waits for every article
+            items = list(prefetched_items())
+            print(f"Generating {len(items)} blog posts")
+            blog_posts = self.blog_generator.generate_blog_posts_batch(items)
+        else:
+            blog_posts = self.blog_generator.generate_blog_posts(prefetched_items(), use_openai)
+        
+        for article_data, blog_post in zip(to_generate, blog_posts):
+            if blog_post is None:
+                # Batch still running - the article stays at the fetched stage for the next run
+                print(f"Blog post not ready yet, skipping for this run: {article_data['title']}")
+                continue
+            print(f"Generated blog post: {blog_post['title']}")
+            article_data['blog_post'] = blog_post
+            self._save_stage(article_data, self.article_store.STATE_GENERATED, blog_post=blog_post)
+        
+        return [article_data for article_data in prepared
+                if article_data['state'] in self.resumable_states]
     
     def run(self, prompt_only=False):
         """Main execution function"""
@@ -25,42 +211,37 @@ class TistoryAutoBlog:
         
         if prompt_only:
             print("*** PROMPT TEST MODE - Will generate prompts only and exit ***")
+            browser_future = None
+        else:
+            # Chrome launch and Kakao login run while articles are fetched and posts are generated
+            browser_future = self._start_browser()
         
         # Get articles from Korea RSS feeds
         articles = self.rss_manager.get_rss_articles(self.max_articles)
         if not articles:
             print("No articles found")
+            if browser_future:
+                self._discard_browser()
             return
         
         print(f"Found {len(articles)} articles")
         
+        # Start fetching full article content right away
+        prefetch_queue = self._start_prefetch(articles)
+        
         # If prompt_only mode, just generate and show prompts
         if prompt_only:
-            for i, article_data in enumerate(articles, 1):
+            for i in range(1, len(articles) + 1):
+                article_data, full_content = prefetch_queue.get()
+                if not article_data['state']:
+                    self._save_stage(article_data, self.article_store.STATE_FETCHED, full_content=full_content)
                 print(f"\n{'='*80}")
                 print(f"PROMPT {i}/{len(articles)}: {article_data['title']}")
                 print(f"Article link: {article_data['link']}")
                 print(f"{'='*80}")
                 
-                # Get full article content if available
-                full_content = ""
-                if article_data['link']:
-                    print(f"Fetching full content from: {article_data['link']}")
-                    full_content = self.rss_manager.get_full_article_content(article_data['link'])
-                    if full_content:
-                        print(f"Full content fetched: {len(full_content)} characters")
-                    else:
-                        print("Failed to fetch full content, using description")
-                        full_content = article_data['description']
-                else:
-                    full_content = article_data['description']
-                
                 # Prepare data for blog generation
-                keyword_data = {
-                    'keyword': article_data['title'],
-                    'source_url': article_data['link']
-                }
-                news_contents = [full_content] if full_content else []
+                keyword_data, news_contents = self._prepare_generation_input(article_data, full_content)
                 
                 # Generate and display prompt only
                 prompt = self.blog_generator.get_prompt_only(keyword_data, news_contents)
@@ -68,17 +249,27 @@ class TistoryAutoBlog:
                 print(prompt)
                 print(f"\n{'='*80}")
             
+            self.rss_manager.print_selector_stats()
+            self.blog_generator.print_prompt_stats()
             print(f"\nPrompt test completed - Generated {len(articles)} prompts")
             return
         
         # Normal execution mode
-        # Setup browser once for all articles
+        # Generate every blog post up front (concurrently) - generated posts are saved,
+        # so a later login or posting failure doesn't waste the completions
+        use_openai = True  # Set to True to use OpenAI, False for dummy data
+        
+        # Browser was set up once for all articles in the background
         driver = None
         login_success = False
         
         try:
-            driver = self.tistory_poster.setup_chrome_driver()
-            login_success = self.tistory_poster.login_to_tistory(driver)
+            articles = self._generate_blog_posts(articles, prefetch_queue, use_openai)
+            if not articles:
+                print("No blog posts ready to publish")
+                return
+            
+            driver, login_success = self._wait_for_browser(browser_future)
             
             if not login_success:
                 print("Failed to login to Tistory")
@@ -86,43 +277,30 @@ class TistoryAutoBlog:
             
             print("Successfully logged in to Tistory")
             
-            # Process each article
+            # Post each article in the order its content finished prefetching
             for i, article_data in enumerate(articles, 1):
                 print(f"\n{'='*50}")
                 print(f"Processing article {i}/{len(articles)}: {article_data['title']}")
                 print(f"Article link: {article_data['link']}")
+                blog_post = article_data['blog_post']
                 
-                # Get full article content if available
-                full_content = ""
-                if article_data['link']:
-                    print(f"Fetching full content from: {article_data['link']}")
-                    full_content = self.rss_manager.get_full_article_content(article_data['link'])
-                    if full_content:
-                        print(f"Full content fetched: {len(full_content)} characters")
-                    else:
-                        print("Failed to fetch full content, using description")
-                        full_content = article_data['description']
-                else:
-                    full_content = article_data['description']
-                
-                # Prepare data for blog generation
-                keyword_data = {
-                    'keyword': article_data['title'],
-                    'source_url': article_data['link']
-                }
-                news_contents = [full_content] if full_content else []
-                
-                print(f"Content prepared for blog generation: {len(news_contents)} items")
-                
-                # Generate blog post using OpenAI (or dummy data)
-                use_openai = True  # Set to True to use OpenAI, False for dummy data
-                blog_post = self.blog_generator.generate_blog_post(keyword_data, news_contents, use_openai)
-                print(f"Generated blog post: {blog_post['title']}")
+                if article_data['state'] == self.article_store.STATE_PUBLISH_UNKNOWN:
+                    # A previous run may have published it after all - check the feed before posting again
+                    entry_url = self.tistory_poster.find_published_post(blog_post['title'])
+                    if entry_url:
+                        self.article_store.mark_posted(article_data['key'])
+                        print(f"✅ Article {i} was already posted by a previous run: {entry_url}")
+                        continue
                 
-                # Post to Tistory
-                if self.tistory_poster.post_to_tistory(driver, blog_post['title'], blog_post['body'], blog_post['tags']):
+                # Post to Tistory - the article key is only marked processed once it is published
+                outcome = self.tistory_poster.publish(driver, blog_post['title'], blog_post['body'], blog_post['tags'])
+                if outcome == self.tistory_poster.HTTP_CREATED:
+                    self.article_store.mark_posted(article_data['key'])
                     print(f"✅ Successfully posted article {i}: {article_data['title']}")
                 else:
+                    if outcome == self.tistory_poster.HTTP_UNKNOWN:
+                        self._save_stage(article_data, self.article_store.STATE_PUBLISH_UNKNOWN)
+                    self.article_store.record_failure(article_data['key'])
                     print(f"❌ Failed to post article {i}: {article_data['title']}")
                 
                 # Add delay between posts to avoid rate limiting
@@ -136,7 +314,17 @@ class TistoryAutoBlog:
         finally:
             if driver:
                 driver.quit()
+            else:
+                # Generation failed or there was nothing to post - quit the background browser once it is up
+                self._discard_browser()
         
+        self.rss_manager.print_selector_stats()
+        self.blog_generator.print_prompt_stats()
+        self.blog_generator.print_model_stats()
+        self.tistory_poster.print_login_stats()
+        self.tistory_poster.print_publish_stats()
+        self.tistory_poster.waiter.print_stats()
+        self.tistory_poster.print_selector_stats()
         print(f"\nTistory Auto Blog completed - Processed {len(articles)} articles")
 
 
@@ -0,0 +1,257 @@
+import os
+import re
+import time
+import array
+import random
+import sqlite3
+import hashlib
+
+
+class NearDuplicateIndex:
+    """MinHash signatures over character shingles with an LSH band index, persisted in SQLite.
+    
+    Two texts whose shingle sets have Jaccard similarity s share at least one
+    band bucket with probability 1 - (1 - s^rows)^bands, so only those
+    candidates are compared instead of every stored article.
+    """
+    
+    MERSENNE_PRIME = (1 << 61) - 1
+    MAX_HASH = (1 << 32) - 1
+    
+    def __init__(self, db_file='near_duplicates.db', num_perm=64, bands=16, threshold=0.6, shingle_size=3, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.db_file = db_file
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.stats = {'queries': 0, 'candidates': 0, 'duplicates': 0}
+        
+        # Fixed seed - signatures stored by earlier runs must use the same permutations
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randrange(1, self.MERSENNE_PRIME), rng.randrange(0, self.MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        
+        self.conn = sqlite3.connect(self.db_file)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS signatures (
+                key TEXT PRIMARY KEY,
+                signature BLOB NOT NULL,
+                title TEXT,
+                added_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS lsh_buckets (
+                band INTEGER NOT NULL,
+                bucket BLOB NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (band, bucket, key)
+            ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+    
+    def _shingles(self, text):
+        """Character n-grams of the text with punctuation and whitespace removed"""
+        text = re.sub(r'[\W_]+', '', text.lower())
+        if len(text) <= self.shingle_size:
+            return {text}
+        return {text[i:i + self.shingle_size] for i in range(len(text) - self.shingle_size + 1)}
+    
+    def signature(self, text):
+        """MinHash signature of the text as a list of num_perm 32-bit values"""
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'little')
+            for shingle in self._shingles(text)
+        ]
+        prime, max_hash = self.MERSENNE_PRIME, self.MAX_HASH
+        return [min(((a * h + b) % prime) & max_hash for h in hashes) for a, b in self.permutations]
+    
+    def _band_buckets(self, signature):
+        for band in range(self.bands):
+            rows = array.array('I', signature[band * self.rows:(band + 1) * self.rows]).tobytes()
+            yield band, hashlib.blake2b(rows, digest_size=8).digest()
+    
+    def similarity(self, signature, other):
+        """Estimated Jaccard similarity: the fraction of matching MinHash values"""
+        return sum(1 for x, y in zip(signature, other) if x == y) / self.num_perm
+    
+    def find_duplicate(self, signature, exclude_key=None):
+        """Return (key, similarity) of the most similar stored article at or above threshold, or None"""
+        self.stats['queries'] += 1
+        candidates = set()
+        for band, bucket in self._band_buckets(signature):
+            rows = self.conn.execute(
+                "SELECT key FROM lsh_buckets WHERE band = ? AND bucket = ?", (band, bucket)
+            ).fetchall()
+            candidates.update(row[0] for row in rows)
+        candidates.discard(exclude_key)
+        self.stats['candidates'] += len(candidates)
+        
+        best = None
+        for key in candidates:
+            row = self.conn.execute("SELECT signature FROM signatures WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                continue
+            similarity = self.similarity(signature, array.array('I', row[0]))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        
+        if best:
+            self.stats['duplicates'] += 1
+        return best
+    
+    def add(self, key, signature, title=''):
+        """Store an article's signature and its LSH buckets"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO signatures (key, signature, title, added_at) VALUES (?, ?, ?, ?)",
+                (key, array.array('I', signature).tobytes(), title, time.time())
+            )
+            if cursor.rowcount:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO lsh_buckets (band, bucket, key) VALUES (?, ?, ?)",
+                    [(band, bucket, key) for band, bucket in self._band_buckets(signature)]
+                )
+    
+    def prune(self, max_age_days):
+        """Drop signatures older than max_age_days, returning how many were removed"""
+        cutoff = time.time() - max_age_days * 86400
+        with self.conn:
+            removed = self.conn.execute("DELETE FROM signatures WHERE added_at < ?", (cutoff,)).rowcount
+            if removed:
+                self.conn.execute("DELETE FROM lsh_buckets WHERE key NOT IN (SELECT key FROM signatures)")
+        return removed
+    
+    def count(self):
+        """Return the number of stored signatures"""
+        return self.conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+    
+    def close(self):
+        self.conn.close()
+
+
+def _synthetic_corpus(num_articles, duplicate_rate, seed=7):
+    """Build policy-news-like articles where some are edited copies of earlier ones.
+    
+    Returns a list of (key, text, original_key); original_key is None for originals.
+    """
+    rng = random.Random(seed)
+    syllables = list("정부정책지원금국무회의대통령장관발표추진계획경제산업기술교육보건복지국민안전주택청년일자리")
+    vocabulary = list({''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(3000)})
+    prefixes = ['', '[국무회의] ', '[정책브리핑] ', '[보도자료] ']
+    
+    articles = []
+    originals = []
+    for i in range(num_articles):
+        key = f"policyNewsView_{148000000 + i}"
+        if originals and rng.random() < duplicate_rate:
+            # Same announcement republished in another feed: new prefix, a few words changed, sentences dropped
+            original_key, words = rng.choice(originals)
+            words = [rng.choice(vocabulary) if rng.random() < 0.05 else word for word in words]
+            words = words[:len(words) - rng.randint(0, 8)]
+            articles.append((key, rng.choice(prefixes) + ' '.join(words), original_key))
+        else:
+            words = [rng.choice(vocabulary) for _ in range(rng.randint(60, 120))]
+            originals.append((key, words))
+            articles.append((key, ' '.join(words), None))
+    return articles
+
+
+def benchmark_near_duplicates(num_articles=3000, duplicate_rate=0.2, brute_force_articles=500):
+    """Benchmark MinHash/LSH near-duplicate detection against brute-force Jaccard comparison"""
+    import tempfile
+    
+    print(f"Benchmarking near-duplicate detection on {num_articles} articles "
+          f"({duplicate_rate:.0%} republished copies)...")
+    articles = _synthetic_corpus(num_articles, duplicate_rate)
+    cluster_of = {key: original_key or key for key, _, original_key in articles}
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index = NearDuplicateIndex(os.path.join(tmp_dir, 'near_duplicates.db'))
+        
+        signature_time = query_time = 0.0
+        true_positives = false_positives = false_negatives = 0
+        for key, text, original_key in articles:
+            start_time = time.perf_counter()
+            signature = index.signature(text)
+            signature_time += time.perf_counter() - start_time
+            
+            start_time = time.perf_counter()
+            duplicate = index.find_duplicate(signature)
+            query_time += time.perf_counter() - start_time
+            
+            if duplicate and cluster_of[duplicate[0]] == cluster_of[key]:
+                true_positives += 1
+            elif duplicate:
+                false_positives += 1
+            elif original_key:
+                false_negatives += 1
+            
+            if not duplicate:
+                index.add(key, signature)
+        
+        db_bytes = sum(os.path.getsize(os.path.join(tmp_dir, name)) for name in os.listdir(tmp_dir))
+        print(f"Signature: {signature_time / num_articles * 1000:.2f} ms/article, "
+              f"LSH query: {query_time / num_articles * 1000:.2f} ms/article "
+              f"({index.stats['candidates'] / num_articles:.2f} candidates/query)")
+        print(f"Precision: {true_positives / max(true_positives + false_positives, 1):.3f}, "
+              f"recall: {true_positives / max(true_positives + false_negatives, 1):.3f} "
+              f"({true_positives} found, {false_positives} false, {false_negatives} missed)")
+        print(f"Index: {index.count()} signatures, {db_bytes / 1024:.0f} KB on disk")
+        
+        # Exact Jaccard against every earlier article - what the LSH index avoids
+        shingle_sets = []
+        start_time = time.perf_counter()
+        for _, text, _ in articles[:brute_force_articles]:
+            shingles = index._shingles(text)
+            for other in shingle_sets:
+                len(shingles & other) / len(shingles | other)
+            shingle_sets.append(shingles)
+        brute_force_time = time.perf_counter() - start_time
+        print(f"Brute-force Jaccard over the first {brute_force_articles} articles: "
+              f"{brute_force_time / brute_force_articles * 1000:.2f} ms/article (grows with the archive)")
+        index.close()
+
+
+def test_near_duplicates():
+    """Test function for near-duplicate detection"""
+    import tempfile
+    
+    print("Testing near-duplicate index...")
+    
+    original = ("정부는 오늘 국무회의에서 청년 주거 지원 확대 방안을 확정했다. 내년부터 청년 월세 지원 대상이 "
+                "중위소득 60%에서 100%로 넓어지고, 지원 기간도 12개월에서 24개월로 늘어난다.")
+    republished = "[국무회의] " + original.replace("오늘", "20일")
+    unrelated = ("과학기술정보통신부는 인공지능 반도체 연구개발에 3년간 1조원을 투입한다고 밝혔다. "
+                 "국산 AI 반도체를 데이터센터에 적용하는 실증 사업도 함께 추진한다.")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, 'near_duplicates.db')
+        index = NearDuplicateIndex(db_file)
+        index.add('policyNewsView_1', index.signature(original), '청년 주거 지원 확대')
+        index.close()
+        
+        # Reopen to check the index persists across runs
+        index = NearDuplicateIndex(db_file)
+        print(f"Republished copy: {index.find_duplicate(index.signature(republished))} (should match policyNewsView_1)")
+        print(f"Unrelated article: {index.find_duplicate(index.signature(unrelated))} (should be None)")
+        print(f"Pruned with 0 day TTL: {index.prune(0)} (should be 1)")
+        index.close()
+    
+    print("\nNear-duplicate index test completed!")
+
+
+if __name__ == "__main__":
+    import sys
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        benchmark_near_duplicates()
+    else:
+        test_near_duplicates()
@@ -1,11 +1,118 @@
 import os
+import re
+import json
+import time
+import random
+import asyncio
+import threading
 import openai
+from openai.types import CompletionUsage
+from completion_cache import CompletionCache
+from token_budget import TokenCounter
+from http.server import BaseHTTPRequestHandler
+from stub_server import start_stub_server
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
 
+# JSON schema for structured output mode - title, body and tags come back as fields instead of free text
+BLOG_POST_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': 'string', 'description': '50자 이내의 클릭 유도형 제목'},
+        'body': {'type': 'string', 'description': '마크다운 형식 본문'},
+        'tags': {'type': 'array', 'items': {'type': 'string'}, 'description': '관련 태그 5개 (# 없이)'}
+    },
+    'required': ['title', 'body', 'tags'],
+    'additionalProperties': False
+}
+
+
+class StreamAbortedError(Exception):
+    """Raised when a streamed completion is abandoned because its format is wrong"""
+
+
+class _StreamingSectionParser:
+    """Splits a streamed completion into title/body/tags sections as deltas arrive"""
+    
+    def __init__(self, header_check_chars=300, structured=False):
+        self.header_check_chars = header_check_chars
+        self.structured = structured
+        self.started_at = time.time()
+        self.content = ""
+        self.partial_line = ""
+        self.section = None
+        self.title = ""
+        self.tags = ""
+        self.body_chars = 0
+        self.title_at = None
+        self.tags_at = None
+        self.failed = False
+    
+    def feed(self, delta):
+        """Add a delta and parse every line it completes"""
+        self.content += delta
+        if self.structured:
+            self._parse_json_prefix()
+        else:
+            self.partial_line += delta
+            while '\n' in self.partial_line:
+                line, self.partial_line = self.partial_line.split('\n', 1)
+                self._parse_line(line.strip())
+        
+        # The response format starts with the title - without it the whole completion ends up as fallback content
+        if not self.title and len(self.content) >= self.header_check_chars:
+            self.failed = True
+    
+    def finish(self):
+        """Parse the last unterminated line and return the full content"""
+        if self.structured:
+            self.body_chars = len(self.content)
+        elif self.partial_line:
+            self._parse_line(self.partial_line.strip())
+            self.partial_line = ""
+        return self.content
+    
+    def _parse_json_prefix(self):
+        """Pick the title out of a partial JSON object as soon as its string is complete"""
+        if self.title:
+            return
+        match = re.search(r'"title"\s*:\s*"((?:[^"\\]|\\.)*)"', self.content)
+        if match:
+            self.title = json.loads(f'"{match.group(1)}"')
+            self.title_at = time.time() - self.started_at
+            print(f"[DEBUG] Streamed title after {self.title_at:.2f}s: '{self.title}'")
+    
+    def _parse_line(self, line):
+        if line.startswith('제목:'):
+            self.title = line.replace('제목:', '').strip()
+            self.section = 'title'
+            self.title_at = time.time() - self.started_at
+            print(f"[DEBUG] Streamed title after {self.title_at:.2f}s: '{self.title}'")
+        elif line.startswith('본문:'):
+            self.section = 'body'
+            self.body_chars += len(line.replace('본문:', '').strip())
+        elif line.startswith('태그:') or line.startswith('해시태그:'):
+            self.tags = line.replace('태그:', '').replace('해시태그:', '').strip()
+            self.section = 'tags'
+            self.tags_at = time.time() - self.started_at
+            print(f"[DEBUG] Streamed tags after {self.tags_at:.2f}s: '{self.tags}'")
+        elif self.section == 'body' and line:
+            self.body_chars += len(line)
+        elif self.section == 'tags' and line:
+            self.tags += ' ' + line
+
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list (0 for an empty list)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
 class OpenAIBlogGenerator:
     def __init__(self):
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
@@ -15,6 +122,65 @@ class OpenAIBlogGenerator:
         else:
             print("[WARNING] OPENAI_API_KEY not found - will use dummy data only")
             self.openai_client = None
+        
+        # Completion settings
+        self.model = "gpt-3.5-turbo"
+        self.max_tokens = 2000
+        self.temperature = 0.7
+        self.system_message = "당신은 한국어 블로그 포스트를 작성하는 전문 작가입니다. 뉴스 내용을 바탕으로 정확하고 흥미로운 블로그 포스트를 마크다운 형식으로 작성해주세요. 마크다운 문법을 정확히 사용하여 가독성 높은 포스트를 작성하세요."
+        
+        # Model chain: self.model first, then each fallback model when the previous one fails,
+        # times out or returns a response that can't be parsed. An entry may set its own 'prompt_token_budget'
+        self.request_timeout = 60
+        self.fallback_models = [{'model': 'gpt-4o', 'timeout': 120}]
+        # Per-article budget across every model tried
+        self.article_latency_budget = 240
+        self.article_cost_budget = 0.05  # USD
+        # USD per 1M input / output tokens
+        self.model_prices = {
+            'gpt-3.5-turbo': (0.5, 1.5),
+            'gpt-4o-mini': (0.15, 0.6),
+            'gpt-4o': (2.5, 10.0)
+        }
+        # Per-model success rate and latency, kept across runs so the chain can be tuned
+        self.model_stats_file = 'model_stats.json'
+        self.max_latency_samples = 500
+        self.model_stats = self._load_model_stats()
+        
+        # Prompt token budget (system message + prompt); news content is trimmed to fit
+        self.prompt_token_budget = 3000
+        self.min_news_tokens = 200  # Per news item, even if the template leaves less
+        self.token_counter = TokenCounter(self.model)
+        self.prompt_stats = []
+        
+        # API usage and cost per completion request
+        self.usage_records = []
+        
+        # Persistent completion cache keyed by model, messages and sampling settings
+        # (30-day expiry, shorter than processed article keys - see KoreaRSSManager.processed_ttl_days)
+        self.use_completion_cache = True
+        self.completion_cache = CompletionCache('completion_cache.db') if self.use_completion_cache else None
+        
+        # Async batch generation settings
+        self.max_concurrency = 4
+        self.max_retries = 5
+        self.retry_base_delay = 1.0
+        
+        # Structured output (JSON schema) for models that support it, a forced function call with the same
+        # schema for older models that only support function calling; other models use the text format parser
+        self.structured_output_models = ('gpt-4o', 'gpt-4.1', 'gpt-5', 'o3', 'o4')
+        self.function_calling_models = ('gpt-3.5-turbo', 'gpt-4')
+        self.blog_post_function = 'write_blog_post'
+        
+        # Streaming: parse sections as tokens arrive and abort completions missing the "제목:" header
+        self.stream_completions = True
+        self.stream_header_check_chars = 300
+        
+        # OpenAI Batch API settings (for large backlogs)
+        self.batch_requests_file = 'batch_requests.jsonl'
+        self.pending_batches_file = 'pending_batches.json'
+        self.batch_poll_interval = 30
+        self.batch_wait_timeout = 3600  # Stop waiting after this; results are collected on the next run
     
     def _prepare_news_summary(self, news_contents):
         """Prepare news content summary for prompt"""
@@ -24,17 +190,181 @@ class OpenAIBlogGenerator:
                 news_summary += f"뉴스 {i}:\n{content}\n\n"
         return news_summary.strip()
     
-    def _create_prompt(self, keyword_data, news_contents):
+    def _fit_news_to_budget(self, keyword_data, news_contents, model=None, budget=None):
+        """Trim news contents at sentence boundaries so the whole prompt fits budget (default prompt_token_budget)"""
+        budget = budget or self.prompt_token_budget
+        template_tokens = self.token_counter.count_messages(
+            self._create_messages(self._build_prompt(keyword_data, "", model))
+        )
+        remaining = budget - template_tokens
+        remaining_items = sum(1 for content in news_contents if content)
+        if remaining_items and remaining < self.min_news_tokens * remaining_items:
+            print(f"[WARNING] Prompt template uses {template_tokens} of {budget} budget tokens - "
+                  f"keeping at least {self.min_news_tokens} tokens per news item, the prompt will exceed the budget")
+        
+        fitted = list(news_contents)
+        # Shortest first, splitting what is left evenly, so space unused by short articles goes to longer ones
+        for i in sorted(range(len(news_contents)), key=lambda i: len(news_contents[i] or '')):
+            if not news_contents[i]:
+                continue
+            header_tokens = self.token_counter.count(f"뉴스 {i + 1}:\n\n\n")
+            # Never trim an article to nothing, even when the template alone eats the budget
+            item_budget = max(remaining // remaining_items - header_tokens, self.min_news_tokens)
+            fitted[i] = self.token_counter.trim_to_budget(news_contents[i], item_budget)
+            remaining -= self.token_counter.count(fitted[i]) + header_tokens
+            remaining_items -= 1
+        return fitted
+    
+    def _record_prompt_tokens(self, keyword_data, prompt, news_contents, fitted_contents, budget=None):
+        """Count and report the prompt's tokens"""
+        prompt_tokens = self.token_counter.count_messages(self._create_messages(prompt))
+        original_tokens = sum(self.token_counter.count(content) for content in news_contents if content)
+        news_tokens = sum(self.token_counter.count(content) for content in fitted_contents if content)
+        trimmed = news_tokens < original_tokens
+        
+        self.prompt_stats.append({
+            'keyword': keyword_data['keyword'],
+            'prompt_tokens': prompt_tokens,
+            'news_tokens': news_tokens,
+            'trimmed': trimmed
+        })
+        print(f"[DEBUG] Prompt tokens: {prompt_tokens}/{budget or self.prompt_token_budget} "
+              f"(news {news_tokens}{f', trimmed from {original_tokens}' if trimmed else ''}, "
+              f"tokenizer {self.token_counter.name})")
+    
+    def print_prompt_stats(self):
+        """Print prompt token usage for the prompts built in this run"""
+        if not self.prompt_stats:
+            return
+        prompt_tokens = [stat['prompt_tokens'] for stat in self.prompt_stats]
+        trimmed = sum(1 for stat in self.prompt_stats if stat['trimmed'])
+        print(f"\nPrompt tokens ({self.token_counter.name}): {len(prompt_tokens)} prompts, "
+              f"avg {sum(prompt_tokens) / len(prompt_tokens):.0f}, max {max(prompt_tokens)}, "
+              f"budget {self.prompt_token_budget}, {trimmed} trimmed")
+        for stat in self.prompt_stats:
+            print(f"  {stat['prompt_tokens']:>5}  {stat['keyword'][:50]}")
+        
+        if self.usage_records:
+            print(f"API usage: {len(self.usage_records)} requests, "
+                  f"{sum(record['prompt_tokens'] for record in self.usage_records)} prompt tokens, "
+                  f"{sum(record['completion_tokens'] for record in self.usage_records)} completion tokens, "
+                  f"${sum(record['cost'] for record in self.usage_records):.4f}")
+    
+    def _record_usage(self, usage, latency=None, model=None, estimated=False):
+        """Record token usage (including cached prompt tokens) reported by the API; returns its cost in USD.
+        
+        estimated marks usage counted locally for a request that failed before the API reported any.
+        """
+        if usage is None:
+            return 0.0
+        model = model or self.model
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = (getattr(details, 'cached_tokens', 0) or 0) if details else 0
+        input_price, output_price = self.model_prices.get(model, (0.0, 0.0))
+        # Cached prompt tokens are billed at half price
+        cost = ((usage.prompt_tokens - cached_tokens / 2) * input_price
+                + usage.completion_tokens * output_price) / 1_000_000
+        self.usage_records.append({
+            'model': model,
+            'prompt_tokens': usage.prompt_tokens,
+            'cached_tokens': cached_tokens,
+            'completion_tokens': usage.completion_tokens,
+            'cost': cost,
+            'latency': latency,
+            'estimated': estimated
+        })
+        print(f"[DEBUG] Usage ({model}{', estimated' if estimated else ''}): "
+              f"{usage.prompt_tokens} prompt tokens{f' ({cached_tokens} cached)' if cached_tokens else ''}, "
+              f"{usage.completion_tokens} completion tokens, ${cost:.4f}"
+              f"{f', {latency:.2f}s' if latency is not None else ''}")
+        return cost
+    
+    def _record_failed_usage(self, model, prompt, progress, error, latency=None):
+        """Record what a failed request is billed for and return its cost in USD.
+        
+        Uses the API's usage when it arrived, otherwise the prompt plus the tokens streamed so far.
+        A request that timed out in flight before streaming anything may still run to completion
+        server-side, so it is charged max_tokens of output; errors the API answered with are not billed.
+        """
+        if progress['usage'] is not None:
+            return self._record_usage(progress['usage'], latency, model)
+        if progress['parser'] is not None:
+            completion_tokens = self.token_counter.count(progress['parser'].content)
+        elif progress['in_flight'] and isinstance(error, (asyncio.TimeoutError, openai.APITimeoutError)):
+            completion_tokens = self.max_tokens
+        else:
+            return 0.0
+        prompt_tokens = self.token_counter.count_messages(self._create_messages(prompt))
+        usage = CompletionUsage(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                total_tokens=prompt_tokens + completion_tokens)
+        return self._record_usage(usage, latency, model, estimated=True)
+    
+    def _estimate_cost(self, model, prompt):
+        """Upper bound on a request's cost in USD: the full prompt plus max_tokens of output"""
+        input_price, output_price = self.model_prices.get(model, (0.0, 0.0))
+        prompt_tokens = self.token_counter.count_messages(self._create_messages(prompt))
+        return (prompt_tokens * input_price + self.max_tokens * output_price) / 1_000_000
+    
+    def _load_model_stats(self):
+        """Load per-model attempt counts and latency samples"""
+        try:
+            if os.path.exists(self.model_stats_file):
+                with open(self.model_stats_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            return {}
+        except Exception as e:
+            print(f"[DEBUG] Error loading model stats: {e}")
+            return {}
+    
+    def _save_model_stats(self):
+        """Save per-model attempt counts and latency samples"""
+        try:
+            with open(self.model_stats_file, 'w', encoding='utf-8') as f:
+                json.dump(self.model_stats, f, indent=2)
+        except Exception as e:
+            print(f"[DEBUG] Error saving model stats: {e}")
+    
+    def _record_model_attempt(self, model, success, latency):
+        """Record one request to a model; only successful requests contribute latency samples"""
+        stats = self.model_stats.setdefault(model, {'attempts': 0, 'successes': 0, 'latencies': []})
+        stats['attempts'] += 1
+        if success:
+            stats['successes'] += 1
+            stats['latencies'].append(round(latency, 3))
+            del stats['latencies'][:-self.max_latency_samples]
+    
+    def print_model_stats(self):
+        """Print per-model success rate, latency percentiles and this run's cost"""
+        if not self.model_stats:
+            return
+        print("\nModel stats (all runs):")
+        for model, stats in self.model_stats.items():
+            latencies = sorted(stats['latencies'])
+            cost = sum(record['cost'] for record in self.usage_records if record['model'] == model)
+            print(f"  {model:<16} {stats['successes']}/{stats['attempts']} succeeded "
+                  f"({stats['successes'] / max(stats['attempts'], 1):.0%}), "
+                  f"p50 {_percentile(latencies, 50):.2f}s, p95 {_percentile(latencies, 95):.2f}s, "
+                  f"this run ${cost:.4f}")
+    
+    def _create_prompt(self, keyword_data, news_contents, model=None):
         """Create unified prompt for OpenAI"""
-        news_summary = self._prepare_news_summary(news_contents)
+        return self._build_prompt(keyword_data, self._fit_news_summary(keyword_data, news_contents, model), model)
+    
+    def _fit_news_summary(self, keyword_data, news_contents, model=None, budget=None):
+        """Trim the news to the prompt budget and return the summary for _build_prompt, reporting the prompt"""
+        fitted_contents = self._fit_news_to_budget(keyword_data, news_contents, model, budget)
+        news_summary = self._prepare_news_summary(fitted_contents)
+        prompt = self._build_prompt(keyword_data, news_summary, model)
         
-        prompt = f"""다음은 현재 트렌드 키워드 "{keyword_data['keyword']}"에 대한 최신 뉴스 내용입니다.
-
-{news_summary}
-
----
-
-아래 뉴스 내용을 바탕으로 마크다운 형식의 블로그 글을 작성해주세요.
+        print(f"prompt : {prompt}")
+        self._record_prompt_tokens(keyword_data, prompt, news_contents, fitted_contents, budget)
+        
+        return news_summary
+    
+    def _build_prompt_instructions(self, model=None):
+        """Static part of the prompt - writing instructions shared by every article"""
+        return """뉴스 내용을 바탕으로 마크다운 형식의 블로그 글을 작성해주세요.
+뉴스 내용은 이 안내문 마지막에 주어집니다.
 
 ---
 
@@ -91,14 +421,36 @@ class OpenAIBlogGenerator:
 - 링크: [텍스트](URL)
 - 줄바꿈: 빈 줄로 단락 구분
 
-응답 형식을 반드시 아래와같이 지켜주세요.
+""" + self._response_format_instructions(model)
+    
+    def _response_format_instructions(self, model=None):
+        """Response format section of the instructions"""
+        if self._use_function_calling(model):
+            return f"""응답은 {self.blog_post_function} 함수를 호출해 title(제목), body(마크다운 형식 본문), tags(태그 5개 목록) 인자로 전달해주세요.
+"""
+        if self._use_structured_output(model):
+            return """응답은 title(제목), body(마크다운 형식 본문), tags(태그 5개 목록) 필드를 가진 JSON으로 작성해주세요.
+"""
+        return """응답 형식을 반드시 아래와같이 지켜주세요.
 응답형식
 제목: [제목]
 본문: [마크다운 형식 본문]
 태그: [태그1, 태그2, 태그3, 태그4, 태그5]
 """
+    
+    def _build_prompt(self, keyword_data, news_summary, model=None):
+        """Fill the prompt template: static instructions first, per-article content last"""
+        prompt = f"""{self._build_prompt_instructions(model)}
+---
 
-        print(f"prompt : {prompt}")
+다음은 현재 트렌드 키워드 "{keyword_data['keyword']}"에 대한 최신 뉴스 내용입니다.
+
+{news_summary}
+
+---
+
+{'위 작성 조건에 맞춰 title, body, tags를 채워주세요.' if self._use_structured_output(model) else '위 응답형식(제목:/본문:/태그:)을 지켜 작성해주세요.'}
+"""
         
         return prompt
     
@@ -245,6 +597,186 @@ class OpenAIBlogGenerator:
         
         return title, body, tags
     
+    def _use_json_schema(self, model=None):
+        """Whether the model (default: self.model) supports JSON schema structured output"""
+        return (model or self.model).startswith(self.structured_output_models)
+    
+    def _use_function_calling(self, model=None):
+        """Whether the model gets BLOG_POST_SCHEMA as a forced function call instead of a JSON schema"""
+        return not self._use_json_schema(model) and (model or self.model).startswith(self.function_calling_models)
+    
+    def _use_structured_output(self, model=None):
+        """Whether the model returns title/body/tags as JSON, through either a JSON schema or a function call"""
+        return self._use_json_schema(model) or self._use_function_calling(model)
+    
+    def _response_format(self, model=None):
+        """response_format argument for JSON schema output, or None for other models"""
+        if not self._use_json_schema(model):
+            return None
+        return {
+            'type': 'json_schema',
+            'json_schema': {'name': 'blog_post', 'strict': True, 'schema': BLOG_POST_SCHEMA}
+        }
+    
+    def _function_call_kwargs(self, model=None):
+        """tools/tool_choice arguments forcing a BLOG_POST_SCHEMA function call, or {} for other models"""
+        if not self._use_function_calling(model):
+            return {}
+        return {
+            'tools': [{
+                'type': 'function',
+                'function': {
+                    'name': self.blog_post_function,
+                    'description': '완성된 블로그 글을 제목, 본문, 태그로 나누어 전달합니다.',
+                    'parameters': BLOG_POST_SCHEMA
+                }
+            }],
+            'tool_choice': {'type': 'function', 'function': {'name': self.blog_post_function}}
+        }
+    
+    def _message_text(self, message):
+        """Text of a completion message (or delta): the function call arguments if there are any, else the content"""
+        tool_calls = getattr(message, 'tool_calls', None)
+        if tool_calls:
+            return ''.join(call.function.arguments or '' for call in tool_calls if call.function)
+        return message.content or ''
+    
+    def _parse_structured_response(self, content):
+        """Parse a structured output response; returns None if it isn't valid JSON"""
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError as e:
+            # Usually a completion cut off by max_tokens
+            print(f"[DEBUG] Structured response is not valid JSON ({e}), trying text parser")
+            return None
+        tags = data.get('tags') or []
+        if isinstance(tags, list):
+            tags = ', '.join(tag.strip().lstrip('#') for tag in tags)
+        return (data.get('title') or '').strip(), (data.get('body') or '').strip(), tags.strip()
+    
+    def _create_messages(self, prompt):
+        """Create chat messages for the completion request"""
+        return [
+            {"role": "system", "content": self.system_message},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _completion_cache_key(self, prompt, model=None):
+        """Cache key for a completion of this prompt with the current settings"""
+        return CompletionCache.make_key(model or self.model, self.system_message, prompt, self.temperature, self.max_tokens)
+    
+    def _get_cached_post(self, cache_key):
+        """Return a cached blog post dict for the key, or None"""
+        if not self.completion_cache:
+            return None
+        cached = self.completion_cache.get(cache_key)
+        if cached:
+            print(f"[DEBUG] Completion cache hit: {cache_key[:12]} - {cached['title']}")
+            return {
+                'title': cached['title'],
+                'body': cached['body'],
+                'tags': cached['tags']
+            }
+        return None
+    
+    def _process_openai_content(self, content, keyword_data, news_contents, cache_key=None, model=None,
+                                use_fallback=True):
+        """Parse and validate OpenAI output, falling back when parsing fails.
+        
+        With use_fallback=False a failed parse returns None so the caller can try another model.
+        """
+        model = model or self.model
+        print(f"[DEBUG] OpenAI raw response length: {len(content)} characters")
+        print(f"[DEBUG] OpenAI raw response preview:\n{content[:500]}...")
+        
+        parsed = self._parse_structured_response(content) if self._use_structured_output(model) else None
+        title, body, tags = parsed or self._parse_openai_response(content)
+        
+        print(f"[DEBUG] Parsed title: '{title}' (length: {len(title) if title else 0})")
+        print(f"[DEBUG] Parsed body: '{body[:100] if body else 'None'}...' (length: {len(body) if body else 0})")
+        print(f"[DEBUG] Parsed tags: '{tags}' (length: {len(tags) if tags else 0})")
+        
+        # Validate parsed content
+        if not title or not body:
+            print("[DEBUG] OpenAI response parsing failed, using fallback")
+            print(f"[DEBUG] Title empty: {not title}, Body empty: {not body}")
+            
+            # Save raw response for debugging
+            try:
+                with open("openai_response_debug.txt", "w", encoding="utf-8") as f:
+                    f.write(f"=== RAW RESPONSE ===\n{content}\n\n")
+                    f.write(f"=== PARSED RESULTS ===\n")
+                    f.write(f"Title: '{title}'\n")
+                    f.write(f"Body: '{body}'\n")
+                    f.write(f"Tags: '{tags}'\n")
+                print("[DEBUG] Raw response saved to openai_response_debug.txt")
+            except Exception as save_error:
+                print(f"[DEBUG] Could not save debug file: {save_error}")
+            
+            if not use_fallback:
+                return None
+            title, body, tags = self._create_fallback_content(keyword_data, news_contents)
+        elif cache_key and self.completion_cache:
+            # Only successfully parsed completions are cached, never fallback content
+            self.completion_cache.put(cache_key, model, content, title, body, tags)
+        
+        return title, body, tags
+    
+    def _create_completion_kwargs(self, prompt, model=None):
+        """Keyword arguments for chat.completions.create"""
+        kwargs = {
+            'model': model or self.model,
+            'messages': self._create_messages(prompt),
+            'max_tokens': self.max_tokens,
+            'temperature': self.temperature
+        }
+        if self._use_json_schema(model):
+            kwargs['response_format'] = self._response_format(model)
+        kwargs.update(self._function_call_kwargs(model))
+        if self.stream_completions:
+            kwargs['stream'] = True
+            # Usage arrives in a final chunk
+            kwargs['stream_options'] = {'include_usage': True}
+        return kwargs
+    
+    def _finish_stream(self, parser, keyword_data):
+        """Return the streamed content, or raise StreamAbortedError if the stream was abandoned"""
+        content = parser.finish()
+        elapsed = time.time() - parser.started_at
+        if parser.failed:
+            raise StreamAbortedError(
+                f"No title in the first {len(content)} characters for "
+                f"'{keyword_data['keyword'][:30]}', aborted stream after {elapsed:.2f}s"
+            )
+        print(f"[DEBUG] Stream finished in {elapsed:.2f}s ({len(content)} characters, body {parser.body_chars})")
+        return content
+    
+    async def _consume_stream_async(self, stream, keyword_data, model=None, progress=None):
+        """Read a streamed completion, stopping early when the parser flags a bad format.
+        
+        Returns (content, usage). progress, when given, holds the parser and usage so a failed
+        request can still be charged for what was streamed.
+        """
+        parser = _StreamingSectionParser(self.stream_header_check_chars, self._use_structured_output(model))
+        if progress is not None:
+            progress['parser'] = parser
+        usage = None
+        try:
+            async for chunk in stream:
+                if chunk.usage:
+                    usage = chunk.usage
+                    if progress is not None:
+                        progress['usage'] = usage
+                delta = self._message_text(chunk.choices[0].delta) if chunk.choices else ''
+                if delta:
+                    parser.feed(delta)
+                    if parser.failed:
+                        break
+        finally:
+            # Closing the connection stops generation, so we don't pay for the rest of the tokens
+            await stream.close()
+        return self._finish_stream(parser, keyword_data), usage
+    
     def generate_blog_post(self, keyword_data, news_contents, use_openai=True):
         """Generate blog post using OpenAI API or fallback to dummy data"""
         print(f"[DEBUG] Generating blog post for keyword: {keyword_data['keyword']}")
@@ -260,54 +792,9 @@ class OpenAIBlogGenerator:
                 # Has news content, use fallback format
                 title, body, tags = self._create_fallback_content(keyword_data, news_contents)
         else:
-            # Try to use OpenAI
-            try:
-                prompt = self._create_prompt(keyword_data, news_contents)
-                
-                # Call OpenAI API
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "당신은 한국어 블로그 포스트를 작성하는 전문 작가입니다. 뉴스 내용을 바탕으로 정확하고 흥미로운 블로그 포스트를 마크다운 형식으로 작성해주세요. 마크다운 문법을 정확히 사용하여 가독성 높은 포스트를 작성하세요."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=2000,
-                    temperature=0.7
-                )
-                
-                # Parse response
-                content = response.choices[0].message.content
-                print(f"[DEBUG] OpenAI raw response length: {len(content)} characters")
-                print(f"[DEBUG] OpenAI raw response preview:\n{content[:500]}...")
-                
-                title, body, tags = self._parse_openai_response(content)
-                
-                print(f"[DEBUG] Parsed title: '{title}' (length: {len(title) if title else 0})")
-                print(f"[DEBUG] Parsed body: '{body[:100] if body else 'None'}...' (length: {len(body) if body else 0})")
-                print(f"[DEBUG] Parsed tags: '{tags}' (length: {len(tags) if tags else 0})")
-                
-                # Validate parsed content
-                if not title or not body:
-                    print("[DEBUG] OpenAI response parsing failed, using fallback")
-                    print(f"[DEBUG] Title empty: {not title}, Body empty: {not body}")
-                    
-                    # Save raw response for debugging
-                    try:
-                        with open("openai_response_debug.txt", "w", encoding="utf-8") as f:
-                            f.write(f"=== RAW RESPONSE ===\n{content}\n\n")
-                            f.write(f"=== PARSED RESULTS ===\n")
-                            f.write(f"Title: '{title}'\n")
-                            f.write(f"Body: '{body}'\n")
-                            f.write(f"Tags: '{tags}'\n")
-                        print("[DEBUG] Raw response saved to openai_response_debug.txt")
-                    except Exception as save_error:
-                        print(f"[DEBUG] Could not save debug file: {save_error}")
-                    
-                    title, body, tags = self._create_fallback_content(keyword_data, news_contents)
-                    
-            except Exception as e:
-                print(f"[DEBUG] Error generating blog post with OpenAI: {e}")
-                title, body, tags = self._create_fallback_content(keyword_data, news_contents)
+            # Same model chain, retries and fallback handling as multi-post generation
+            blog_post = self.generate_blog_posts([(keyword_data, news_contents)])[0]
+            title, body, tags = blog_post['title'], blog_post['body'], blog_post['tags']
         
         print(f"[DEBUG] Generated title: {title}")
         print(f"[DEBUG] Generated body length: {len(body)}")
@@ -318,6 +805,342 @@ class OpenAIBlogGenerator:
             'body': body,
             'tags': tags
         }
+    
+    def _retry_delay(self, error, attempt):
+        """Seconds to wait before retrying, honouring Retry-After when the API sends it"""
+        response = getattr(error, 'response', None)
+        if response is not None:
+            retry_after = response.headers.get('retry-after')
+            try:
+                if retry_after:
+                    return float(retry_after)
+            except ValueError:
+                pass
+        return self.retry_base_delay * (2 ** attempt) + random.uniform(0, self.retry_base_delay)
+    
+    def _model_chain(self):
+        """Models to try in order, each with its request timeout"""
+        return [{'model': self.model, 'timeout': self.request_timeout}] + list(self.fallback_models)
+    
+    async def _request_completion_async(self, client, model, prompt, keyword_data, progress):
+        """Request one completion, retrying on rate limits and transient errors. Returns (content, usage).
+        
+        progress tracks the current request for _record_failed_usage; the cost of retried
+        requests is added to progress['cost'].
+        """
+        for attempt in range(self.max_retries + 1):
+            progress.update(in_flight=True, parser=None, usage=None)
+            request_start = time.time()
+            try:
+                response = await client.chat.completions.create(**self._create_completion_kwargs(prompt, model))
+                if self.stream_completions:
+                    return await self._consume_stream_async(response, keyword_data, model, progress)
+                return self._message_text(response.choices[0].message), response.usage
+            except (openai.RateLimitError, openai.APIConnectionError,
+                    openai.APITimeoutError, openai.InternalServerError) as e:
+                if attempt == self.max_retries:
+                    raise
+                progress['cost'] += self._record_failed_usage(model, prompt, progress, e, time.time() - request_start)
+                progress['in_flight'] = False
+                delay = self._retry_delay(e, attempt)
+                print(f"[DEBUG] {type(e).__name__} for '{keyword_data['keyword'][:30]}', "
+                      f"retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                # Keep the semaphore slot while backing off so we don't add load during rate limiting
+                await asyncio.sleep(delay)
+    
+    async def _generate_blog_post_async(self, client, semaphore, keyword_data, news_contents):
+        """Generate one blog post, moving down the model chain until one succeeds or the article's budget runs out"""
+        start_time = time.time()
+        spent = 0.0
+        
+        # The news is fitted once; a later model only re-fits it when its prompt budget differs
+        chain = self._model_chain()
+        news_budget = chain[0].get('prompt_token_budget', self.prompt_token_budget)
+        news_summary = self._fit_news_summary(keyword_data, news_contents, chain[0]['model'], news_budget)
+        
+        async with semaphore:
+            for position, entry in enumerate(chain):
+                model = entry['model']
+                if entry.get('prompt_token_budget', self.prompt_token_budget) != news_budget:
+                    news_budget = entry.get('prompt_token_budget', self.prompt_token_budget)
+                    news_summary = self._fit_news_summary(keyword_data, news_contents, model, news_budget)
+                # Only the response format instructions differ between models
+                prompt = self._build_prompt(keyword_data, news_summary, model)
+                cache_key = self._completion_cache_key(prompt, model)
+                cached_post = self._get_cached_post(cache_key)
+                if cached_post:
+                    return cached_post
+                
+                remaining = self.article_latency_budget - (time.time() - start_time)
+                if position > 0:
+                    estimate = self._estimate_cost(model, prompt)
+                    if remaining <= 0 or spent + estimate > self.article_cost_budget:
+                        print(f"[DEBUG] Budget exhausted for '{keyword_data['keyword'][:30]}' before {model} "
+                              f"({time.time() - start_time:.1f}s, ${spent:.4f} spent, next up to ${estimate:.4f})")
+                        break
+                
+                request_start = time.time()
+                progress = {'in_flight': False, 'parser': None, 'usage': None, 'cost': 0.0}
+                try:
+                    content, usage = await asyncio.wait_for(
+                        self._request_completion_async(client, model, prompt, keyword_data, progress),
+                        timeout=max(0.0, min(entry['timeout'], remaining))
+                    )
+                except (asyncio.TimeoutError, StreamAbortedError, openai.OpenAIError) as e:
+                    # Failed and timed-out requests still count against the cost budget
+                    spent += progress['cost'] + self._record_failed_usage(model, prompt, progress, e,
+                                                                          time.time() - request_start)
+                    self._record_model_attempt(model, False, time.time() - request_start)
+                    print(f"[DEBUG] {model} failed for '{keyword_data['keyword'][:30]}': "
+                          f"{type(e).__name__} {e or f'after {time.time() - request_start:.1f}s'}")
+                    continue
+                
+                latency = time.time() - request_start
+                spent += progress['cost'] + self._record_usage(usage, latency, model)
+                result = self._process_openai_content(content, keyword_data, news_contents, cache_key, model,
+                                                      use_fallback=False)
+                self._record_model_attempt(model, result is not None, latency)
+                if result:
+                    title, body, tags = result
+                    return {
+                        'title': title,
+                        'body': body,
+                        'tags': tags
+                    }
+        
+        print(f"[DEBUG] No model produced a usable post for '{keyword_data['keyword'][:30]}', using fallback")
+        title, body, tags = self._create_fallback_content(keyword_data, news_contents)
+        return {
+            'title': title,
+            'body': body,
+            'tags': tags
+        }
+    
+    async def _generate_blog_posts_async(self, items):
+        """Start a generation for each item as it arrives, limited by max_concurrency.
+        
+        Returns (items, results) with the items in the order they were received.
+        """
+        client = openai.AsyncOpenAI(
+            api_key=self.openai_client.api_key,
+            base_url=self.openai_client.base_url,
+            max_retries=0  # Retries are handled by _request_completion_async
+        )
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        iterator = iter(items)
+        received = []
+        tasks = []
+        
+        try:
+            while True:
+                # next() may block until the item is ready, so it runs in a worker thread
+                # while the generations already started keep going
+                item = await asyncio.to_thread(next, iterator, None)
+                if item is None:
+                    break
+                received.append(item)
+                keyword_data, news_contents = item
+                tasks.append(asyncio.create_task(
+                    self._generate_blog_post_async(client, semaphore, keyword_data, news_contents)
+                ))
+            # gather keeps results in input order
+            return received, await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            await client.close()
+    
+    def generate_blog_posts(self, items, use_openai=True):
+        """Generate blog posts for (keyword_data, news_contents) pairs.
+        
+        items can be a list, or an iterator whose next() blocks until the next item is
+        ready (e.g. while its article is still downloading) - each generation starts as
+        soon as its item arrives. Uses AsyncOpenAI with at most max_concurrency requests
+        in flight. Results are returned in item order; failed items get fallback content.
+        """
+        if not use_openai or not self.openai_client:
+            return [self.generate_blog_post(keyword_data, news_contents, use_openai=False)
+                    for keyword_data, news_contents in items]
+        
+        print(f"[DEBUG] Generating blog posts as their items arrive (max concurrency: {self.max_concurrency})")
+        start_time = time.time()
+        items, results = asyncio.run(self._generate_blog_posts_async(items))
+        if not items:
+            return []
+        print(f"[DEBUG] Generated {len(items)} blog posts in {time.time() - start_time:.2f}s")
+        self._save_model_stats()
+        if self.completion_cache:
+            print(f"[DEBUG] Completion cache: {self.completion_cache.stats['hits']} hits, "
+                  f"{self.completion_cache.stats['misses']} misses")
+        
+        blog_posts = []
+        for (keyword_data, news_contents), result in zip(items, results):
+            if isinstance(result, Exception):
+                print(f"[DEBUG] Error generating blog post with OpenAI: {result}")
+                title, body, tags = self._create_fallback_content(keyword_data, news_contents)
+                result = {
+                    'title': title,
+                    'body': body,
+                    'tags': tags
+                }
+            blog_posts.append(result)
+        return blog_posts
+    
+    def _load_pending_batches(self):
+        """Load submitted batches that have not been collected yet"""
+        try:
+            if os.path.exists(self.pending_batches_file):
+                with open(self.pending_batches_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            return {}
+        except Exception as e:
+            print(f"[DEBUG] Error loading pending batches: {e}")
+            return {}
+    
+    def _save_pending_batches(self, pending_batches):
+        """Save submitted batches that have not been collected yet"""
+        try:
+            with open(self.pending_batches_file, 'w', encoding='utf-8') as f:
+                json.dump(pending_batches, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"[DEBUG] Error saving pending batches: {e}")
+    
+    def _collect_batch(self, batch, keywords):
+        """Parse a finished batch's output into the completion cache.
+        
+        custom_id is the completion cache key, so results map back to articles
+        (including articles from an earlier run) through the cache.
+        """
+        if not batch.output_file_id:
+            return 0
+        
+        output = self.openai_client.files.content(batch.output_file_id).text
+        collected = 0
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            cache_key = result['custom_id']
+            response = result.get('response') or {}
+            if result.get('error') or response.get('status_code') != 200:
+                print(f"[DEBUG] Batch request {cache_key[:12]} failed: {result.get('error')}")
+                continue
+            
+            message = response['body']['choices'][0]['message']
+            tool_calls = message.get('tool_calls') or []
+            content = (''.join(call['function']['arguments'] for call in tool_calls)
+                       if tool_calls else message.get('content') or '')
+            if response['body'].get('usage'):
+                self._record_usage(CompletionUsage.model_validate(response['body']['usage']), model=self.model)
+            keyword_data = {'keyword': keywords.get(cache_key, '')}
+            # Fallback content is not cached, so failed parses are simply regenerated next time
+            self._process_openai_content(content, keyword_data, [], cache_key)
+            collected += 1
+        return collected
+    
+    def _poll_pending_batches(self, wait_timeout=0):
+        """Collect finished batches, polling up to wait_timeout seconds for unfinished ones"""
+        pending_batches = self._load_pending_batches()
+        deadline = time.time() + wait_timeout
+        
+        while pending_batches:
+            for batch_id in list(pending_batches):
+                batch = self.openai_client.batches.retrieve(batch_id)
+                if batch.status == 'completed':
+                    collected = self._collect_batch(batch, pending_batches[batch_id]['keywords'])
+                    print(f"[DEBUG] Batch {batch_id} completed: {collected} results collected")
+                    del pending_batches[batch_id]
+                elif batch.status in ('failed', 'expired', 'cancelled'):
+                    # Expired batches may still carry partial output
+                    self._collect_batch(batch, pending_batches[batch_id]['keywords'])
+                    print(f"[DEBUG] Batch {batch_id} ended with status '{batch.status}'")
+                    del pending_batches[batch_id]
+                else:
+                    print(f"[DEBUG] Batch {batch_id} status: {batch.status}")
+            
+            self._save_pending_batches(pending_batches)
+            if not pending_batches or time.time() + self.batch_poll_interval > deadline:
+                break
+            time.sleep(self.batch_poll_interval)
+        
+        return pending_batches
+    
+    def generate_blog_posts_batch(self, items):
+        """Generate blog posts for (keyword_data, news_contents) pairs with the OpenAI Batch API.
+        
+        Prompts are written to a JSONL file, submitted as one batch and polled
+        for up to batch_wait_timeout seconds. Results come back in input order;
+        items whose batch has not finished yet are None and are collected by the
+        next call (the batch id is kept in pending_batches_file).
+        """
+        if not items:
+            return []
+        
+        if not self.openai_client or not self.completion_cache:
+            print("[DEBUG] Batch mode needs an OpenAI client and the completion cache, using async generation")
+            return self.generate_blog_posts(items)
+        
+        # Results from batches submitted by earlier runs land in the completion cache
+        pending_batches = self._poll_pending_batches()
+        # Prompts already in a batch that is still running are not submitted again
+        pending_keys = {cache_key for batch in pending_batches.values() for cache_key in batch['keywords']}
+        
+        results = [None] * len(items)
+        requests_by_key = {}
+        keys = []
+        for i, (keyword_data, news_contents) in enumerate(items):
+            prompt = self._create_prompt(keyword_data, news_contents)
+            cache_key = self._completion_cache_key(prompt)
+            keys.append(cache_key)
+            results[i] = self._get_cached_post(cache_key)
+            if results[i] is None and cache_key in pending_keys:
+                print(f"[DEBUG] Waiting for a running batch: {keyword_data['keyword'][:30]}")
+            elif results[i] is None and cache_key not in requests_by_key:
+                body = {
+                    'model': self.model,
+                    'messages': self._create_messages(prompt),
+                    'max_tokens': self.max_tokens,
+                    'temperature': self.temperature
+                }
+                if self._use_json_schema():
+                    body['response_format'] = self._response_format()
+                body.update(self._function_call_kwargs())
+                requests_by_key[cache_key] = (keyword_data['keyword'], {
+                    'custom_id': cache_key,
+                    'method': 'POST',
+                    'url': '/v1/chat/completions',
+                    'body': body
+                })
+        
+        if requests_by_key:
+            with open(self.batch_requests_file, 'w', encoding='utf-8') as f:
+                for _, request in requests_by_key.values():
+                    f.write(json.dumps(request, ensure_ascii=False) + '\n')
+            
+            with open(self.batch_requests_file, 'rb') as f:
+                batch_file = self.openai_client.files.create(file=f, purpose='batch')
+            batch = self.openai_client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint='/v1/chat/completions',
+                completion_window='24h'
+            )
+            print(f"[DEBUG] Submitted batch {batch.id} with {len(requests_by_key)} requests")
+            
+            pending_batches = self._load_pending_batches()
+            pending_batches[batch.id] = {
+                'submitted_at': time.time(),
+                'keywords': {cache_key: keyword for cache_key, (keyword, _) in requests_by_key.items()}
+            }
+            self._save_pending_batches(pending_batches)
+            
+            self._poll_pending_batches(self.batch_wait_timeout)
+        
+        for i, cache_key in enumerate(keys):
+            if results[i] is None:
+                results[i] = self._get_cached_post(cache_key)
+        
+        missing = sum(1 for result in results if result is None)
+        if missing:
+            print(f"[DEBUG] {missing} batch results not ready yet - they will be collected on the next run")
+        return results
 
 
 def test_openai_blog():
@@ -365,5 +1188,442 @@ def test_openai_blog():
     print("\nOpenAI blog generation test completed!")
 
 
+class _MockBatchHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the Files and Batches endpoints; batches complete after a few polls"""
+    polls_until_complete = 2
+    files = {}
+    batches = {}
+    lock = threading.Lock()
+    
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        data = self.rfile.read(length)
+        
+        if self.path.endswith('/files'):
+            # Pull the uploaded JSONL out of the multipart body
+            from email.parser import BytesParser
+            message = BytesParser().parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + data
+            )
+            content = next(part.get_payload(decode=True) for part in message.get_payload()
+                           if part.get_filename())
+            with self.lock:
+                file_id = f"file-mock-{len(self.files) + 1}"
+                self.files[file_id] = content
+            self._send_json(200, {
+                'id': file_id, 'object': 'file', 'bytes': len(content), 'created_at': int(time.time()),
+                'filename': 'batch_requests.jsonl', 'purpose': 'batch', 'status': 'processed'
+            })
+        elif self.path.endswith('/batches'):
+            request = json.loads(data)
+            with self.lock:
+                batch_id = f"batch-mock-{len(self.batches) + 1}"
+                self.batches[batch_id] = {'input_file_id': request['input_file_id'], 'polls': 0}
+            self._send_json(200, self._batch_payload(batch_id, 'validating'))
+    
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        if parts[-2] == 'batches':
+            batch_id = parts[-1]
+            with self.lock:
+                batch = self.batches[batch_id]
+                batch['polls'] += 1
+                if batch['polls'] >= self.polls_until_complete and 'output_file_id' not in batch:
+                    batch['output_file_id'] = self._run_batch(batch['input_file_id'])
+            status = 'completed' if 'output_file_id' in batch else 'in_progress'
+            self._send_json(200, self._batch_payload(batch_id, status))
+        elif parts[-1] == 'content':
+            content = self.files[parts[-2]]
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+    
+    def _run_batch(self, input_file_id):
+        output_lines = []
+        for line in self.files[input_file_id].decode('utf-8').splitlines():
+            request = json.loads(line)
+            keyword = re.search(r'키워드 "(.*?)"', request['body']['messages'][-1]['content']).group(1)
+            if request['body'].get('tools'):
+                message = _MockCompletionsHandler._message(json.dumps({
+                    'title': f"{keyword} 정리", 'body': f"## {keyword}\n{keyword}에 대한 배치 테스트 본문입니다.",
+                    'tags': ['테스트', '배치']
+                }, ensure_ascii=False), tool_call=True)
+            else:
+                message = {'role': 'assistant', 'content': f"제목: {keyword} 정리\n본문: ## {keyword}\n"
+                                                          f"{keyword}에 대한 배치 테스트 본문입니다.\n태그: 테스트, 배치"}
+            output_lines.append(json.dumps({
+                'id': f"batch-req-{len(output_lines)}",
+                'custom_id': request['custom_id'],
+                'response': {'status_code': 200, 'body': {
+                    'choices': [{'index': 0, 'message': message, 'finish_reason': 'stop'}]
+                }},
+                'error': None
+            }, ensure_ascii=False))
+        output_file_id = f"file-mock-{len(self.files) + 1}"
+        self.files[output_file_id] = '\n'.join(output_lines).encode('utf-8')
+        return output_file_id
+    
+    def _batch_payload(self, batch_id, status):
+        batch = self.batches[batch_id]
+        return {
+            'id': batch_id, 'object': 'batch', 'endpoint': '/v1/chat/completions',
+            'input_file_id': batch['input_file_id'], 'completion_window': '24h',
+            'status': status, 'created_at': int(time.time()),
+            'output_file_id': batch.get('output_file_id')
+        }
+    
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def test_batch_generation(num_articles=5):
+    """Test Batch API generation against a local fake batch endpoint"""
+    import tempfile
+    
+    print("Testing batch blog generation against mock server...")
+    
+    server, base_url = start_stub_server(_MockBatchHandler)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        blog_generator = OpenAIBlogGenerator()
+        blog_generator.openai_client = openai.OpenAI(
+            api_key='mock-key', base_url=f"{base_url}/v1"
+        )
+        blog_generator.completion_cache = CompletionCache(':memory:')
+        blog_generator.batch_requests_file = os.path.join(tmp_dir, 'batch_requests.jsonl')
+        blog_generator.pending_batches_file = os.path.join(tmp_dir, 'pending_batches.json')
+        blog_generator.batch_poll_interval = 0.1
+        
+        items = [({'keyword': f'배치키워드{i}', 'source_url': ''}, [f'뉴스 내용 {i}']) for i in range(num_articles)]
+        
+        try:
+            results = blog_generator.generate_blog_posts_batch(items)
+            in_order = all(result and result['title'] == f"배치키워드{i} 정리" for i, result in enumerate(results))
+            print(f"Generated {len(results)} posts via batch, mapped back in input order: {in_order}")
+            print(f"Pending batches left: {blog_generator._load_pending_batches()}")
+            
+            # A second call while the first batch is still running must not submit its prompts again
+            _MockBatchHandler.polls_until_complete = 100
+            blog_generator.batch_wait_timeout = 0
+            slow_items = [({'keyword': f'대기키워드{i}', 'source_url': ''}, [f'뉴스 내용 {i}']) for i in range(2)]
+            batches_before = len(_MockBatchHandler.batches)
+            for _ in range(2):
+                results = blog_generator.generate_blog_posts_batch(slow_items)
+            print(f"Batches submitted for the same prompts over two calls: "
+                  f"{len(_MockBatchHandler.batches) - batches_before}, results pending: {results == [None, None]}")
+        finally:
+            server.shutdown()
+            _MockBatchHandler.polls_until_complete = 2
+    
+    print("\nBatch generation test completed!")
+
+
+class _MockCompletionsHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the chat completions endpoint, rate limiting every third request once"""
+    delay = 0.5
+    stream_chunk_delay = 0.01
+    body_lines = 1
+    request_count = 0
+    aborted_streams = 0
+    token_counter = None
+    lock = threading.Lock()
+    
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length))
+        keyword = re.search(r'키워드 "(.*?)"', request['messages'][-1]['content']).group(1)
+        
+        with self.lock:
+            _MockCompletionsHandler.request_count += 1
+            count = _MockCompletionsHandler.request_count
+        
+        if count % 3 == 0:
+            self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_error'}},
+                            {'retry-after': '0.2'})
+            return
+        
+        if request['model'] == 'mock-slow':
+            time.sleep(3)
+        
+        if keyword.startswith('불량') or request['model'] == 'mock-broken':
+            # Malformed completion: rambles without the required "제목:" header
+            content = f"{keyword}에 대해 말씀드리자면 여러 가지 측면이 있습니다.\n" * 40
+        elif (request.get('response_format') or {}).get('type') == 'json_schema' or request.get('tools'):
+            body = f"{keyword}에 대한 테스트 본문입니다.\n" * self.body_lines
+            content = json.dumps({'title': f"{keyword} 정리", 'body': f"## {keyword}\n{body}",
+                                  'tags': ['테스트', '모의서버']}, ensure_ascii=False)
+        else:
+            body = f"{keyword}에 대한 테스트 본문입니다.\n" * self.body_lines
+            content = f"제목: {keyword} 정리\n본문: ## {keyword}\n{body}태그: 테스트, 모의서버"
+        usage = self._usage(request['messages'], content)
+        # Well-formed answers to a forced function call come back as its arguments
+        tool_call = bool(request.get('tools')) and content.startswith('{')
+        
+        if request.get('stream'):
+            include_usage = (request.get('stream_options') or {}).get('include_usage')
+            self._send_stream(content, request['model'], count, usage if include_usage else None, tool_call)
+            return
+        
+        time.sleep(self.delay)
+        self._send_json(200, {
+            'id': f'chatcmpl-mock-{count}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request['model'],
+            'choices': [{
+                'index': 0,
+                'message': self._message(content, tool_call),
+                'finish_reason': 'tool_calls' if tool_call else 'stop'
+            }],
+            'usage': usage
+        })
+    
+    @staticmethod
+    def _message(content, tool_call=False):
+        """Assistant message carrying the content, or a write_blog_post call with it as arguments"""
+        if not tool_call:
+            return {'role': 'assistant', 'content': content}
+        return {'role': 'assistant', 'content': None, 'tool_calls': [{
+            'id': 'call_mock', 'type': 'function',
+            'function': {'name': 'write_blog_post', 'arguments': content}
+        }]}
+    
+    def _usage(self, messages, content):
+        """Usage counted with the same tokenizer the generator uses"""
+        with self.lock:
+            if _MockCompletionsHandler.token_counter is None:
+                _MockCompletionsHandler.token_counter = TokenCounter()
+        prompt_tokens = self.token_counter.count_messages(messages)
+        completion_tokens = self.token_counter.count(content)
+        return {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens
+        }
+    
+    def _send_stream(self, content, model, count, usage=None, tool_call=False):
+        """Send the completion as server-sent events, a few characters per chunk"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        try:
+            for i in range(0, len(content), 8):
+                chunk = {
+                    'id': f'chatcmpl-mock-{count}',
+                    'object': 'chat.completion.chunk',
+                    'created': int(time.time()),
+                    'model': model,
+                    'choices': [{'index': 0, 'delta': self._delta(content[i:i + 8], tool_call, first=i == 0),
+                                 'finish_reason': None}]
+                }
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+                time.sleep(self.stream_chunk_delay)
+            if usage:
+                chunk = {
+                    'id': f'chatcmpl-mock-{count}',
+                    'object': 'chat.completion.chunk',
+                    'created': int(time.time()),
+                    'model': model,
+                    'choices': [],
+                    'usage': usage
+                }
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode('utf-8'))
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client aborted the stream
+            _MockCompletionsHandler.aborted_streams += 1
+    
+    @staticmethod
+    def _delta(piece, tool_call=False, first=False):
+        """Stream delta for a piece of content or of the function call arguments"""
+        if not tool_call:
+            return {'content': piece}
+        call = {'index': 0, 'function': {'arguments': piece}}
+        if first:
+            call.update(id='call_mock', type='function')
+            call['function']['name'] = 'write_blog_post'
+        return {'tool_calls': [call]}
+    
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def test_async_generation(num_articles=8):
+    """Test async batch generation against a local mock completions server"""
+    print("Testing async blog generation against mock server...")
+    
+    server, base_url = start_stub_server(_MockCompletionsHandler)
+    
+    blog_generator = OpenAIBlogGenerator()
+    blog_generator.openai_client = openai.OpenAI(
+        api_key='mock-key', base_url=f"{base_url}/v1"
+    )
+    blog_generator.retry_base_delay = 0.1
+    blog_generator.stream_completions = False
+    blog_generator.completion_cache = None  # Always hit the mock server
+    blog_generator.model_stats_file = os.devnull
+    
+    items = [({'keyword': f'키워드{i}', 'source_url': ''}, [f'뉴스 내용 {i}']) for i in range(num_articles)]
+    
+    try:
+        start_time = time.time()
+        results = blog_generator.generate_blog_posts(items)
+        elapsed = time.time() - start_time
+        
+        in_order = all(result['title'] == f"키워드{i} 정리" for i, result in enumerate(results))
+        print(f"Generated {len(results)} posts in {elapsed:.2f}s "
+              f"(sequential would take at least {num_articles * _MockCompletionsHandler.delay:.1f}s)")
+        print(f"Results in input order: {in_order}")
+        blog_generator.print_prompt_stats()
+    finally:
+        server.shutdown()
+    
+    print("\nAsync generation test completed!")
+
+
+def test_streaming_generation():
+    """Test streamed generation, including early abort of a completion without a title header"""
+    print("Testing streaming blog generation against mock server...")
+    
+    _MockCompletionsHandler.body_lines = 30
+    server, base_url = start_stub_server(_MockCompletionsHandler)
+    
+    blog_generator = OpenAIBlogGenerator()
+    blog_generator.openai_client = openai.OpenAI(
+        api_key='mock-key', base_url=f"{base_url}/v1", max_retries=0
+    )
+    blog_generator.completion_cache = None
+    blog_generator.fallback_models = []
+    blog_generator.model_stats_file = os.devnull
+    
+    try:
+        print("\n1. Well-formed completion...")
+        start_time = time.time()
+        result = blog_generator.generate_blog_post({'keyword': '스트리밍', 'source_url': ''}, ['뉴스 내용'])
+        print(f"Title: {result['title']}, body {len(result['body'])} characters, "
+              f"total {time.time() - start_time:.2f}s")
+        
+        print("\n2. Completion without a title header...")
+        start_time = time.time()
+        result = blog_generator.generate_blog_post({'keyword': '불량키워드', 'source_url': ''}, ['뉴스 내용'])
+        print(f"Fell back to: {result['title']} after {time.time() - start_time:.2f}s")
+        time.sleep(0.2)
+        print(f"Streams aborted by client: {_MockCompletionsHandler.aborted_streams}")
+    finally:
+        server.shutdown()
+        _MockCompletionsHandler.body_lines = 1
+    
+    print("\nStreaming generation test completed!")
+
+
+def test_structured_generation():
+    """Test JSON schema and function calling output, streamed and not, against the mock completions server"""
+    print("Testing structured output generation against mock server...")
+    
+    server, base_url = start_stub_server(_MockCompletionsHandler)
+    
+    blog_generator = OpenAIBlogGenerator()
+    blog_generator.openai_client = openai.OpenAI(
+        api_key='mock-key', base_url=f"{base_url}/v1"
+    )
+    blog_generator.retry_base_delay = 0.1
+    blog_generator.completion_cache = None
+    blog_generator.fallback_models = []
+    blog_generator.model_stats_file = os.devnull
+    
+    items = [({'keyword': f'구조화{i}', 'source_url': ''}, [f'뉴스 내용 {i}']) for i in range(4)]
+    
+    try:
+        # JSON schema, then a forced function call for a model without JSON schema support
+        for model in ('gpt-4o-mini', 'gpt-3.5-turbo'):
+            blog_generator.model = model
+            for stream in (False, True):
+                blog_generator.stream_completions = stream
+                results = blog_generator.generate_blog_posts(items)
+                parsed = all(result['title'] == f"구조화{i} 정리" and result['tags'] == '테스트, 모의서버'
+                             for i, result in enumerate(results))
+                print(f"{model}, streaming {stream}: {len(results)} posts, all parsed from JSON: {parsed}")
+    finally:
+        server.shutdown()
+    
+    print("\nStructured output generation test completed!")
+
+
+def test_model_chain():
+    """Test falling back through the model chain and the per-article budget against the mock server"""
+    print("Testing model chain against mock server...")
+    
+    server, base_url = start_stub_server(_MockCompletionsHandler)
+    
+    blog_generator = OpenAIBlogGenerator()
+    blog_generator.openai_client = openai.OpenAI(
+        api_key='mock-key', base_url=f"{base_url}/v1"
+    )
+    blog_generator.retry_base_delay = 0.1
+    blog_generator.completion_cache = None
+    blog_generator.model_stats = {}
+    blog_generator.model_stats_file = os.devnull
+    
+    # Unparseable output, then a model that times out, then one that works
+    blog_generator.model = 'mock-broken'
+    blog_generator.fallback_models = [
+        {'model': 'mock-slow', 'timeout': 0.5},
+        {'model': 'gpt-4o-mini', 'timeout': 10}
+    ]
+    # Priced so failed and timed-out attempts show up in the spend
+    blog_generator.model_prices.update({'mock-broken': (0.15, 0.6), 'mock-slow': (0.15, 0.6)})
+    items = [({'keyword': f'체인{i}', 'source_url': ''}, [f'뉴스 내용 {i}']) for i in range(4)]
+    
+    try:
+        print("\n1. Falling back to the last model...")
+        results = blog_generator.generate_blog_posts(items)
+        print(f"Served by the last model: {all(result['title'] == f'체인{i} 정리' for i, result in enumerate(results))}")
+        
+        print("\n2. Cost budget too small for any fallback...")
+        blog_generator.article_cost_budget = 0.0001
+        results = blog_generator.generate_blog_posts(items[:1])
+        print(f"Fallback content used: {results[0]['title'] != '체인0 정리'}")
+        
+        blog_generator.print_model_stats()
+    finally:
+        server.shutdown()
+    
+    print("\nModel chain test completed!")
+
+
 if __name__ == "__main__":
-    test_openai_blog()
\ No newline at end of file
+    import sys
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "async":
+        test_async_generation()
+    elif len(sys.argv) > 1 and sys.argv[1] == "batch":
+        test_batch_generation()
+    elif len(sys.argv) > 1 and sys.argv[1] == "stream":
+        test_streaming_generation()
+    elif len(sys.argv) > 1 and sys.argv[1] == "structured":
+        test_structured_generation()
+    elif len(sys.argv) > 1 and sys.argv[1] == "chain":
+        test_model_chain()
+    else:
+        test_openai_blog()
\ No newline at end of file
@@ -0,0 +1,176 @@
+import re
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, NoAlertPresentException
+
+# Counts in-flight fetch/XHR requests so a wait can end once the page goes quiet
+_TRACK_NETWORK_JS = """
+if (window.__pendingRequests === undefined) {
+    window.__pendingRequests = 0;
+    var done = function() { window.__pendingRequests--; window.__lastRequestActivity = Date.now(); };
+    var originalFetch = window.fetch;
+    window.fetch = function() {
+        window.__pendingRequests++;
+        window.__lastRequestActivity = Date.now();
+        return originalFetch.apply(this, arguments).finally(done);
+    };
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        window.__pendingRequests++;
+        window.__lastRequestActivity = Date.now();
+        this.addEventListener('loadend', done);
+        return originalSend.apply(this, arguments);
+    };
+}
+window.__lastRequestActivity = Date.now();
+"""
+
+_NETWORK_IDLE_JS = """
+return window.__pendingRequests === 0 && Date.now() - window.__lastRequestActivity >= arguments[0];
+"""
+
+# Milliseconds since the last DOM mutation, installing the observer on first call
+_DOM_QUIET_JS = """
+if (window.__lastMutation === undefined) {
+    window.__lastMutation = Date.now();
+    new MutationObserver(function() { window.__lastMutation = Date.now(); })
+        .observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+return Date.now() - window.__lastMutation;
+"""
+
+# Checks every candidate in one round trip; returns [element, index] of the first
+# (in list order) that is present - and visible and enabled when clickable is set
+_FIRST_MATCH_JS = """
+var queries = arguments[0], clickable = arguments[1];
+for (var i = 0; i < queries.length; i++) {
+    var element = null;
+    try {
+        if (queries[i].xpath) {
+            element = document.evaluate(queries[i].xpath, document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        } else {
+            element = document.querySelector(queries[i].css);
+        }
+    } catch (e) {
+        continue;  // Invalid selector
+    }
+    if (!element) continue;
+    if (clickable && (element.disabled || !element.getClientRects().length
+            || getComputedStyle(element).visibility === 'hidden')) continue;
+    return [element, i];
+}
+return null;
+"""
+
+
+def selector_query(selector):
+    """Turn a selector into a CSS or XPath query for the resolver.
+    
+    Strings starting with '/' or '(' are XPath; jQuery-style 'tag:contains(text)',
+    which is not valid CSS, becomes an XPath text match.
+    """
+    if selector.startswith(('/', '(')):
+        return {'xpath': selector}
+    contains = re.fullmatch(r"([\w-]*):contains\((['\"])(.*)\2\)", selector)
+    if contains:
+        return {'xpath': f"//{contains.group(1) or '*'}[contains(normalize-space(.), '{contains.group(3)}')]"}
+    return {'css': selector}
+
+
+def alert_present(driver):
+    """Return the open alert, or False"""
+    try:
+        alert = driver.switch_to.alert
+        alert.text  # Raises if no alert is open
+        return alert
+    except NoAlertPresentException:
+        return False
+
+
+class PageWaiter:
+    """Condition-based waits for Selenium pages that record how long each step took.
+    
+    Every wait returns as soon as its condition holds, or None on timeout
+    instead of raising, so callers keep their existing fallback paths.
+    """
+    
+    def __init__(self, poll_interval=0.1):
+        self.poll_interval = poll_interval
+        self.timings = {}
+        self.timeouts = {}
+        self.selector_probes = 0
+    
+    def until(self, driver, step, condition, timeout=10):
+        """Wait until condition(driver) is truthy and return its value, or None on timeout"""
+        start_time = time.time()
+        try:
+            result = WebDriverWait(driver, timeout, poll_frequency=self.poll_interval).until(condition)
+        except TimeoutException:
+            result = None
+            self.timeouts[step] = self.timeouts.get(step, 0) + 1
+        elapsed = time.time() - start_time
+        self.timings.setdefault(step, []).append(elapsed)
+        print(f"[DEBUG] Wait '{step}': {elapsed:.2f}s{' (timed out)' if result is None else ''}")
+        return result
+    
+    def document_ready(self, driver, step, timeout=15):
+        """Wait for document.readyState to be complete"""
+        return self.until(driver, step, lambda d: d.execute_script("return document.readyState") == "complete", timeout)
+    
+    def element(self, driver, step, locator, clickable=False, timeout=10):
+        """Wait for an element to be present (or clickable) and return it"""
+        condition = EC.element_to_be_clickable(locator) if clickable else EC.presence_of_element_located(locator)
+        return self.until(driver, step, condition, timeout)
+    
+    def alert(self, driver, step, timeout=2):
+        """Wait for an alert to open and return it"""
+        return self.until(driver, step, alert_present, timeout)
+    
+    def url_change(self, driver, step, old_url, timeout=10):
+        """Wait for the page to navigate away from old_url and return the new URL"""
+        return self.until(driver, step, lambda d: d.current_url if d.current_url != old_url else False, timeout)
+    
+    def dom_stable(self, driver, step, quiet_period=0.3, timeout=5):
+        """Wait until the DOM has not changed for quiet_period seconds"""
+        quiet_ms = quiet_period * 1000
+        return self.until(driver, step, lambda d: d.execute_script(_DOM_QUIET_JS) >= quiet_ms, timeout)
+    
+    def first_match(self, driver, step, selectors, clickable=False, timeout=10):
+        """Poll all selectors at once and return (element, selector) for the first that matches, or (None, None)"""
+        queries = [selector_query(selector) for selector in selectors]
+        
+        def probe(d):
+            self.selector_probes += 1
+            return d.execute_script(_FIRST_MATCH_JS, queries, clickable)
+        
+        match = self.until(driver, step, probe, timeout)
+        if not match:
+            return None, None
+        return match[0], selectors[match[1]]
+    
+    def track_network(self, driver):
+        """Start counting fetch/XHR requests; call before the action whose requests network_idle waits on"""
+        driver.execute_script(_TRACK_NETWORK_JS)
+    
+    def network_idle(self, driver, step, idle_time=0.5, timeout=10, old_url=None):
+        """Wait until no tracked request has been in flight for idle_time seconds.
+        
+        With old_url, navigating away from it also ends the wait (the tracker is gone with the page).
+        """
+        def idle(d):
+            if old_url and d.current_url != old_url:
+                return True
+            return d.execute_script(_NETWORK_IDLE_JS, idle_time * 1000)
+        return self.until(driver, step, idle, timeout)
+    
+    def print_stats(self):
+        """Print how long each wait step took"""
+        if not self.timings:
+            return
+        print("\nPage wait timings:")
+        for step, timings in self.timings.items():
+            timeouts = self.timeouts.get(step, 0)
+            print(f"  {step:<28} {len(timings):>3}x  avg {sum(timings) / len(timings):.2f}s  "
+                  f"max {max(timings):.2f}s{f'  ({timeouts} timed out)' if timeouts else ''}")
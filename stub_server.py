@@ -0,0 +1,27 @@
+import os
+import threading
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer
+
+
+def start_stub_server(handler_class):
+    """Start a local HTTP server in a background thread and return (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler_class)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@contextmanager
+def override_environ(**values):
+    """Set environment variables for the duration of the block, then restore the previous values"""
+    saved = {name: os.environ.get(name) for name in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
@@ -1,14 +1,23 @@
 import os
+import json
 import time
+import threading
+import requests
+import markdown
+import feedparser
+from html import escape
+from urllib3.exceptions import NewConnectionError
+from http.server import BaseHTTPRequestHandler
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.keys import Keys
+from page_waits import PageWaiter, alert_present, selector_query
+from stub_server import start_stub_server, override_environ
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -16,6 +25,14 @@ load_dotenv()
 
 
 class TistoryPoster:
+    # Outcomes of a publish attempt - only NOT_CREATED is safe to retry
+    HTTP_CREATED = 'created'
+    HTTP_NOT_CREATED = 'not_created'
+    HTTP_UNKNOWN = 'unknown'
+    
+    # Markdown features the generated posts use, rendered the way the editor's markdown mode does
+    MARKDOWN_EXTENSIONS = ['extra', 'sane_lists']
+    
     def __init__(self):
         self.tistory_username = os.getenv('TISTORY_USERNAME')
         self.tistory_password = os.getenv('TISTORY_PASSWORD')
@@ -28,6 +45,36 @@ class TistoryPoster:
         if not self.tistory_url:
             raise ValueError("TISTORY_URL environment variable is required")
     
+        # Session reuse: restore the Tistory cookies from the last successful login and only
+        # run the Kakao login flow when they have expired
+        self.reuse_session = True
+        self.cookies_file = 'tistory_cookies.json'
+        # Optional persistent Chrome profile - keeps cookies without the cookies file
+        self.user_data_dir = os.getenv('TISTORY_CHROME_PROFILE')
+        self.session_check_url = f"{self.tistory_url.rstrip('/')}/manage"
+        self.login_stats_file = 'login_stats.json'
+        self.max_login_samples = 20
+        self.login_stats = {'full_login_seconds': [], 'runs': []}
+        
+        # 'http' submits posts straight to the editor's save endpoint with the session cookies;
+        # 'selenium' drives the editor UI. The HTTP backend falls back to Selenium on failure.
+        self.publish_backend = 'http'
+        self.http_timeout = 30
+        self.http_session = requests.Session()
+        self.http_session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'application/json, text/plain, */*'
+        })
+        self.publish_stats = {'http': [], 'selenium': []}
+        self.waiter = PageWaiter()
+        
+        # Selector that matched last time for each element lookup (e.g. editor:title), tried first
+        self.selector_cache_file = 'poster_selectors.json'
+        self.selector_cache = self._load_selector_cache()
+        self.selector_stats = {'lookups': 0, 'hits': 0, 'misses': 0, 'not_found': 0}
+        # Winners of the current login/post attempt, cached only once that attempt succeeds
+        self.matched_selectors = {}
+    
     def setup_chrome_driver(self):
         """Setup Chrome WebDriver with headless mode for GitHub Actions"""
         chrome_options = Options()
@@ -38,6 +85,9 @@ class TistoryPoster:
         chrome_options.add_argument('--disable-gpu')
         chrome_options.add_argument('--window-size=1920,1080')
         chrome_options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        if self.user_data_dir:
+            chrome_options.add_argument(f'--user-data-dir={os.path.abspath(self.user_data_dir)}')
+            print(f"[DEBUG] Using Chrome profile: {self.user_data_dir}")
         
         print("[DEBUG] Setting up Chrome WebDriver...")
         
@@ -48,7 +98,385 @@ class TistoryPoster:
         print(f"[DEBUG] WebDriver created successfully")
         return driver
     
+    def _load_login_stats(self):
+        """Load login timings recorded by previous runs"""
+        if os.path.exists(self.login_stats_file):
+            try:
+                with open(self.login_stats_file, 'r', encoding='utf-8') as f:
+                    self.login_stats.update(json.load(f))
+            except Exception as e:
+                print(f"[DEBUG] Error loading login stats: {e}")
+    
+    def _save_login_stats(self):
+        """Save login timings for later runs"""
+        try:
+            with open(self.login_stats_file, 'w', encoding='utf-8') as f:
+                json.dump(self.login_stats, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"[DEBUG] Error saving login stats: {e}")
+    
+    def _record_login(self, mode, seconds):
+        """Record how one login went and, for restored sessions, how much time it saved"""
+        self._load_login_stats()
+        full_logins = self.login_stats['full_login_seconds']
+        if mode == 'full':
+            full_logins.append(round(seconds, 2))
+            del full_logins[:-self.max_login_samples]
+        
+        saved_seconds = None
+        if mode == 'restored' and full_logins:
+            saved_seconds = round(sum(full_logins) / len(full_logins) - seconds, 2)
+        
+        runs = self.login_stats['runs']
+        runs.append({
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'mode': mode,
+            'seconds': round(seconds, 2),
+            'saved_seconds': saved_seconds
+        })
+        del runs[:-self.max_login_samples]
+        self._save_login_stats()
+        
+        if saved_seconds is not None:
+            print(f"[DEBUG] Session restored in {seconds:.1f}s - saved {saved_seconds:.1f}s over a full login")
+        else:
+            print(f"[DEBUG] Login ({mode}) took {seconds:.1f}s")
+    
+    def print_login_stats(self):
+        """Print how often the saved session was reused and the login time it saved"""
+        self._load_login_stats()
+        runs = self.login_stats['runs']
+        if not runs:
+            return
+        restored = [run for run in runs if run['mode'] == 'restored']
+        saved = sum(run['saved_seconds'] or 0 for run in restored)
+        print(f"\nLogin stats (last {len(runs)} runs): {len(restored)} restored sessions, "
+              f"{len(runs) - len(restored)} full logins, {saved:.1f}s saved in total")
+        full_logins = self.login_stats['full_login_seconds']
+        if full_logins:
+            print(f"  Full Kakao login: {sum(full_logins) / len(full_logins):.1f}s on average")
+    
+    def _load_cookies(self):
+        """Load saved session cookies, falling back to the TISTORY_COOKIE environment variable"""
+        cookies = []
+        try:
+            if os.path.exists(self.cookies_file):
+                with open(self.cookies_file, 'r', encoding='utf-8') as f:
+                    cookies = json.load(f)
+            elif os.getenv('TISTORY_COOKIE'):
+                cookies = json.loads(os.getenv('TISTORY_COOKIE'))
+        except Exception as e:
+            print(f"[DEBUG] Error loading session cookies: {e}")
+            return []
+        
+        # Drop cookies that have already expired
+        now = time.time()
+        return [cookie for cookie in cookies if not cookie.get('expiry') or cookie['expiry'] > now]
+    
+    def _save_cookies(self, driver):
+        """Save the Tistory session cookies after a successful login"""
+        try:
+            if "tistory.com" not in driver.current_url:
+                driver.get(self.session_check_url)
+            cookies = [cookie for cookie in driver.get_cookies() if 'tistory.com' in cookie.get('domain', '')]
+            # The file holds a logged-in session - keep it readable by this user only
+            fd = os.open(self.cookies_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(cookies, f, ensure_ascii=False, indent=2)
+            print(f"[DEBUG] Saved {len(cookies)} session cookies to {self.cookies_file}")
+        except Exception as e:
+            print(f"[DEBUG] Error saving session cookies: {e}")
+    
+    def _restore_session(self, driver):
+        """Restore the saved session and check it with one page load; True if still logged in"""
+        try:
+            cookies = self._load_cookies()
+            if not cookies and not self.user_data_dir:
+                print("[DEBUG] No saved session to restore")
+                return False
+            
+            if cookies:
+                # Cookies can only be set for the domain currently loaded - a 404 page is the cheapest one
+                driver.get(f"{self.tistory_url.rstrip('/')}/robots.txt")
+                restored = 0
+                for cookie in cookies:
+                    cookie = {k: v for k, v in cookie.items() if k in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'expiry')}
+                    try:
+                        driver.add_cookie(cookie)
+                        restored += 1
+                    except WebDriverException as e:
+                        print(f"[DEBUG] Could not restore cookie {cookie.get('name')}: {e}")
+                print(f"[DEBUG] Restored {restored}/{len(cookies)} session cookies")
+            
+            # The management page redirects to the login page when the session has expired
+            driver.get(self.session_check_url)
+            current_url = driver.current_url
+            if "login" in current_url.lower() or "/manage" not in current_url:
+                print(f"[DEBUG] Saved session expired (redirected to {current_url})")
+                return False
+            
+            print("[DEBUG] ✅ Saved session is still valid")
+            return True
+            
+        except Exception as e:
+            print(f"[DEBUG] Error restoring session: {e}")
+            return False
+    
     def login_to_tistory(self, driver):
+        """Login to Tistory, reusing the saved session when it is still valid"""
+        start_time = time.time()
+        if self.reuse_session and self._restore_session(driver):
+            self._record_login('restored', time.time() - start_time)
+            return True
+        
+        kakao_start_time = time.time()
+        self.matched_selectors.clear()
+        login_success = self._kakao_login(driver)
+        if login_success:
+            self._record_login('full', time.time() - kakao_start_time)
+            self._remember_selectors('login:')
+            self._remember_selectors('kakao:')
+            if self.reuse_session:
+                self._save_cookies(driver)
+        return login_success
+    
+    def _load_selector_cache(self):
+        """Load the selectors that matched in previous runs"""
+        try:
+            if os.path.exists(self.selector_cache_file):
+                with open(self.selector_cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            return {}
+        except Exception as e:
+            print(f"[DEBUG] Error loading selector cache: {e}")
+            return {}
+    
+    def _save_selector_cache(self):
+        """Save the selectors that matched for later runs"""
+        try:
+            with open(self.selector_cache_file, 'w', encoding='utf-8') as f:
+                json.dump(self.selector_cache, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"[DEBUG] Error saving selector cache: {e}")
+    
+    def _find_element(self, driver, lookup, selectors, clickable=False, timeout=10):
+        """Find the first element matching any of the selectors, polling them all in one script call.
+        
+        The selector cached by a previous successful run is moved to the front; the winner
+        is only cached once the caller's step succeeds (see _remember_selectors).
+        """
+        cached_selector = self.selector_cache.get(lookup)
+        order = list(selectors)
+        if cached_selector in order:
+            order.remove(cached_selector)
+            order.insert(0, cached_selector)
+        
+        element, selector = self.waiter.first_match(driver, lookup, order, clickable, timeout)
+        
+        self.selector_stats['lookups'] += 1
+        if not element:
+            self.selector_stats['not_found'] += 1
+            print(f"[DEBUG] {lookup}: no selector matched within {timeout}s")
+            return None
+        
+        if selector == cached_selector:
+            self.selector_stats['hits'] += 1
+        else:
+            self.selector_stats['misses'] += 1
+        self.matched_selectors[lookup] = selector
+        print(f"[DEBUG] {lookup} found using selector: {selector}")
+        return element
+    
+    def _remember_selectors(self, prefix):
+        """Cache the selectors that matched in a step that succeeded, for lookups starting with prefix.
+        
+        XPath and text-match fallbacks are never cached - they can match the wrong element
+        (e.g. '저장' also matches the draft save button) and must stay last.
+        """
+        changed = False
+        for lookup in [lookup for lookup in self.matched_selectors if lookup.startswith(prefix)]:
+            selector = self.matched_selectors.pop(lookup)
+            if 'xpath' in selector_query(selector) or self.selector_cache.get(lookup) == selector:
+                continue
+            self.selector_cache[lookup] = selector
+            changed = True
+        if changed:
+            self._save_selector_cache()
+    
+    def print_selector_stats(self):
+        """Print how often the remembered selector matched first"""
+        stats = self.selector_stats
+        if not stats['lookups']:
+            return
+        print(f"Element lookups: {stats['lookups']} ({stats['hits']} cached selector hits, "
+              f"{stats['misses']} misses, {stats['not_found']} not found), "
+              f"{self.waiter.selector_probes} script round trips")
+    
+    def _set_codemirror_value(self, driver, content):
+        """Replace the markdown editor's content with CodeMirror setValue and check it by reading it back"""
+        value = driver.execute_script("""
+            var host = document.querySelector('#markdown-editor-container .CodeMirror') || document.querySelector('.CodeMirror');
+            if (!host || !host.CodeMirror) return null;
+            var editor = host.CodeMirror;
+            editor.setValue(arguments[0]);
+            editor.refresh();
+            return editor.getValue();
+        """, content)
+        if value is None:
+            return False
+        
+        # CodeMirror stores line breaks as \n
+        expected = content.replace('\r\n', '\n')
+        if value != expected:
+            print(f"[DEBUG] ❌ CodeMirror read-back mismatch: {len(value)} chars, expected {len(expected)}")
+            # Leave the editor empty for the fallback input
+            driver.execute_script("document.querySelector('.CodeMirror').CodeMirror.setValue('');")
+            return False
+        return True
+    
+    def _sync_http_cookies(self, driver=None):
+        """Copy the logged-in browser's cookies (or the saved ones) into the HTTP session"""
+        cookies = driver.get_cookies() if driver else self._load_cookies()
+        self.http_session.cookies.clear()
+        for cookie in cookies:
+            # Scoped to no domain - the session only ever talks to this blog
+            self.http_session.cookies.set(cookie['name'], cookie['value'])
+        return len(cookies)
+    
+    def _render_markdown(self, content):
+        """Render a markdown body to the HTML the save endpoint takes"""
+        return markdown.markdown(content, extensions=self.MARKDOWN_EXTENSIONS)
+    
+    def post_via_http(self, title, content, tags, driver=None):
+        """Publish a post through the editor's save endpoint.
+        
+        Returns (outcome, entry_url). HTTP_NOT_CREATED means the request was rejected
+        with a 4xx or never sent; HTTP_UNKNOWN (5xx, timeout, dropped connection) means
+        it was sent but the post may or may not exist.
+        """
+        try:
+            if not self._sync_http_cookies(driver):
+                print("[DEBUG] No session cookies for HTTP publishing")
+                return self.HTTP_NOT_CREATED, None
+            
+            blog_url = self.tistory_url.rstrip('/')
+            tag_list = [tag.strip() for tag in (tags or '').split(',') if tag.strip()]
+            payload = {
+                'id': '0',
+                'title': title,
+                'content': self._render_markdown(content),
+                'slogan': '',
+                'visibility': 20,  # public
+                'category': 0,
+                'tag': ','.join(tag_list),
+                'published': 1,
+                'password': '',
+                'uselessMarginForEntry': 1,
+                'cclCommercial': 0,
+                'cclDerive': 0,
+                'type': 'post',
+                'attachments': [],
+                'recaptchaValue': '',
+                'draftSequence': None
+            }
+        except Exception as e:
+            print(f"[DEBUG] ❌ Error preparing HTTP publish: {e}")
+            return self.HTTP_NOT_CREATED, None
+        
+        try:
+            print(f"[DEBUG] Publishing via HTTP: {title}")
+            response = self.http_session.post(
+                f"{blog_url}/manage/post.json",
+                json=payload,
+                headers={'Referer': f"{blog_url}/manage/newpost/", 'Origin': blog_url},
+                timeout=self.http_timeout,
+                allow_redirects=False
+            )
+        except requests.exceptions.ConnectTimeout as e:
+            print(f"[DEBUG] ❌ Could not connect for HTTP publish: {e}")
+            return self.HTTP_NOT_CREATED, None
+        except requests.exceptions.ConnectionError as e:
+            # Failing to open the connection means nothing was sent; a dropped connection might not
+            reason = getattr(e.args[0], 'reason', None) if e.args else None
+            if isinstance(reason, NewConnectionError):
+                print(f"[DEBUG] ❌ Could not connect for HTTP publish: {e}")
+                return self.HTTP_NOT_CREATED, None
+            print(f"[DEBUG] ❌ Connection lost during HTTP publish: {e}")
+            return self.HTTP_UNKNOWN, None
+        except Exception as e:
+            print(f"[DEBUG] ❌ Error during HTTP publish: {e}")
+            return self.HTTP_UNKNOWN, None
+        
+        location = response.headers.get('Location', '')
+        if 400 <= response.status_code < 500 or (response.is_redirect and 'login' in location):
+            # The request was rejected (expired session, bad payload, ...) - the post was not created
+            print(f"[DEBUG] ❌ HTTP publish rejected with status {response.status_code} {location}")
+            return self.HTTP_NOT_CREATED, None
+        
+        entry_url = None
+        if response.status_code == 200:
+            try:
+                entry_url = response.json().get('entryUrl')
+            except ValueError:
+                pass
+        if not entry_url:
+            print(f"[DEBUG] ❌ Unexpected HTTP publish response {response.status_code}: {response.text[:200]}")
+            return self.HTTP_UNKNOWN, None
+        
+        print(f"[DEBUG] ✅ Post published via HTTP: {entry_url}")
+        return self.HTTP_CREATED, entry_url
+    
+    def find_published_post(self, title):
+        """Look for a post with this title in the blog's RSS feed; returns its URL or None"""
+        try:
+            response = self.http_session.get(f"{self.tistory_url.rstrip('/')}/rss", timeout=self.http_timeout)
+            feed = feedparser.parse(response.content)
+            for entry in feed.entries:
+                if entry.get('title', '').strip() == title.strip():
+                    return entry.get('link')
+        except Exception as e:
+            print(f"[DEBUG] Error checking recent posts: {e}")
+        return None
+    
+    def publish(self, driver, title, content, tags):
+        """Publish a post with the configured backend, falling back to the Selenium editor.
+        
+        Returns HTTP_CREATED, HTTP_NOT_CREATED or HTTP_UNKNOWN. Selenium is only used
+        when the HTTP request certainly did not create the post, so an ambiguous failure
+        can never publish it twice; callers should check the feed before retrying it.
+        """
+        if self.publish_backend == 'http':
+            start_time = time.time()
+            outcome, entry_url = self.post_via_http(title, content, tags, driver)
+            if outcome == self.HTTP_CREATED:
+                self.publish_stats['http'].append(time.time() - start_time)
+                return self.HTTP_CREATED
+            
+            if outcome == self.HTTP_UNKNOWN:
+                entry_url = self.find_published_post(title)
+                if entry_url:
+                    print(f"[DEBUG] ✅ Post was created despite the error: {entry_url}")
+                    self.publish_stats['http'].append(time.time() - start_time)
+                    return self.HTTP_CREATED
+                print("[DEBUG] ❌ Post not found in recent posts - not re-posting to avoid a duplicate")
+                return self.HTTP_UNKNOWN
+            
+            print("[DEBUG] Falling back to the Selenium editor")
+        
+        start_time = time.time()
+        if not self.post_to_tistory(driver, title, content, tags):
+            return self.HTTP_NOT_CREATED
+        self.publish_stats['selenium'].append(time.time() - start_time)
+        return self.HTTP_CREATED
+    
+    def print_publish_stats(self):
+        """Print per-post publish latency for each backend used this run"""
+        for backend, latencies in self.publish_stats.items():
+            if latencies:
+                print(f"Publish ({backend}): {len(latencies)} posts, "
+                      f"{sum(latencies) / len(latencies):.2f}s per post on average")
+    
+    def _kakao_login(self, driver):
         """Login to Tistory using Kakao account"""
         try:
             print("[DEBUG] Starting Tistory login process...")
@@ -63,45 +491,21 @@ class TistoryPoster:
             
             # Wait for page to be fully loaded
             print("[DEBUG] Waiting for page to be fully loaded...")
-            WebDriverWait(driver, 2).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            # Wait for JavaScript to complete execution
-            WebDriverWait(driver, 2).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
+            self.waiter.document_ready(driver, 'login page', timeout=5)
             
             # Wait for Kakao login button to load with multiple selectors
             print("[DEBUG] Waiting for Kakao login button to load...")
-            kakao_login_button = None
-            
-            # Try different selectors for Kakao login button
             kakao_selectors = [
                 "#cMain > div > div > div > a.btn_login.link_kakao_id",
                 "a.btn_login.link_kakao_id",
                 "a[href*='kakao']",
-                ".link_kakao_id"
+                ".link_kakao_id",
+                "//a[contains(text(), '카카오') or contains(@class, 'kakao')]"
             ]
-            
-            for selector in kakao_selectors:
-                try:
-                    kakao_login_button = WebDriverWait(driver, 5).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    print(f"[DEBUG] Kakao login button found using selector: {selector}")
-                    break
-                except TimeoutException:
-                    print(f"[DEBUG] Selector {selector} not found, trying next...")
-                    continue
-            
+            kakao_login_button = self._find_element(driver, 'login:kakao_button', kakao_selectors, clickable=True)
             if not kakao_login_button:
-                print("[DEBUG] Kakao login button not found with any selector, trying alternative approach...")
-                # Try finding by text content
-                kakao_login_button = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), '카카오') or contains(@class, 'kakao')]"))
-                )
-                print("[DEBUG] Kakao login button found by text/class content")
+                print("[DEBUG] ❌ Kakao login button not found")
+                return False
             
             # Click Kakao login button
             kakao_login_button.click()
@@ -111,42 +515,25 @@ class TistoryPoster:
             print("[DEBUG] Waiting for Kakao login page...")
             
             # Wait for URL change to confirm navigation
-            WebDriverWait(driver, 5).until(
-                lambda d: "kakao" in d.current_url.lower() or "accounts" in d.current_url.lower()
+            self.waiter.until(
+                driver, 'kakao redirect',
+                lambda d: "kakao" in d.current_url.lower() or "accounts" in d.current_url.lower(),
+                timeout=5
             )
             
             print(f"[DEBUG] Current URL after Kakao button click: {driver.current_url}")
             print(f"[DEBUG] Page title: {driver.title}")
             
             # Wait for page to be fully loaded
-            WebDriverWait(driver, 5).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
+            self.waiter.document_ready(driver, 'kakao login page', timeout=5)
             
             # Wait for Kakao login form with multiple attempts
             print("[DEBUG] Waiting for Kakao login form...")
-            email_field = None
-            
-            # Try multiple selectors for email field
-            email_selectors = ["#loginId--1", "input[type='email']"]
-            
-            for selector in email_selectors:
-                try:
-                    email_field = WebDriverWait(driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    print(f"[DEBUG] Email field found using selector: {selector}")
-                    break
-                except TimeoutException:
-                    print(f"[DEBUG] Email selector {selector} not found, trying next...")
-                    continue
-            
+            email_selectors = ["#loginId--1", "input[type='email']", "input[name='email']"]
+            email_field = self._find_element(driver, 'kakao:email', email_selectors)
             if not email_field:
-                # Fallback to name attribute
-                email_field = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.NAME, "email"))
-                )
-                print("[DEBUG] Email field found using name attribute")
+                print("[DEBUG] ❌ Email field not found")
+                return False
             
             print("[DEBUG] Kakao login form loaded")
             
@@ -158,25 +545,11 @@ class TistoryPoster:
             
             # Find and fill password field with multiple selectors
             print("[DEBUG] Finding password field...")
-            password_field = None
-            
             password_selectors = ["input[name='password']", "#password--2", "input[type='password']"]
-            
-            for selector in password_selectors:
-                try:
-                    password_field = WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    print(f"[DEBUG] Password field found using selector: {selector}")
-                    break
-                except TimeoutException:
-                    print(f"[DEBUG] Password selector {selector} not found, trying next...")
-                    continue
-            
+            password_field = self._find_element(driver, 'kakao:password', password_selectors)
             if not password_field:
-                # Fallback to name attribute
-                password_field = driver.find_element(By.NAME, "password")
-                print("[DEBUG] Password field found using name attribute")
+                print("[DEBUG] ❌ Password field not found")
+                return False
             
             password_field.clear()
             password_field.send_keys(self.tistory_password)
@@ -184,33 +557,18 @@ class TistoryPoster:
             
             # Click login button with multiple selectors
             print("[DEBUG] Looking for Kakao login submit button...")
-            login_submit_button = None
-            
             submit_selectors = [
                 "button[type='submit']",
                 ".btn_confirm",
                 ".btn_login",
                 "input[type='submit']",
-                "button.submit"
+                "button.submit",
+                "//button[contains(text(), '로그인') or contains(text(), '확인')]"
             ]
-            
-            for selector in submit_selectors:
-                try:
-                    login_submit_button = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    print(f"[DEBUG] Submit button found using selector: {selector}")
-                    break
-                except TimeoutException:
-                    print(f"[DEBUG] Submit selector {selector} not found, trying next...")
-                    continue
-            
+            login_submit_button = self._find_element(driver, 'kakao:submit', submit_selectors, clickable=True)
             if not login_submit_button:
-                # Fallback to text-based search
-                login_submit_button = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), '로그인') or contains(text(), '확인')]"))
-                )
-                print("[DEBUG] Submit button found by text content")
+                print("[DEBUG] ❌ Kakao login submit button not found")
+                return False
             
             print(f"[DEBUG] Kakao login submit button found: {login_submit_button.text}")
             login_submit_button.click()
@@ -307,7 +665,7 @@ class TistoryPoster:
                                         print(f"[DEBUG] Found continue button: {btn.text}")
                                         btn.click()
                                         print("[DEBUG] Continue button clicked")
-                                        time.sleep(2)
+                                        self.waiter.until(driver, '2FA continue', EC.staleness_of(btn), timeout=2)
                                         break
                                 except:
                                     # Button became stale, continue with next
@@ -331,7 +689,7 @@ class TistoryPoster:
                                             print(f"[DEBUG] Found continue button during wait: {btn.text}")
                                             btn.click()
                                             print("[DEBUG] Continue button clicked during wait")
-                                            time.sleep(2)
+                                            self.waiter.until(driver, '2FA continue', EC.staleness_of(btn), timeout=2)
                                             break
                                     except:
                                         # Button became stale, continue with next
@@ -346,7 +704,7 @@ class TistoryPoster:
                                                 print(f"[DEBUG] Found login button during wait: {btn.text}")
                                                 btn.click()
                                                 print("[DEBUG] Login button clicked during wait")
-                                                time.sleep(2)
+                                                self.waiter.until(driver, '2FA continue', EC.staleness_of(btn), timeout=2)
                                                 break
                                         except:
                                             # Button became stale, continue with next
@@ -394,7 +752,8 @@ class TistoryPoster:
                     page_source_snippet = driver.page_source[:500]
                     print(f"[DEBUG] Page source snippet: {page_source_snippet}")
                 
-                time.sleep(1)
+                # Re-check as soon as the page navigates, at least once a second
+                self.waiter.url_change(driver, 'login redirect', current_url, timeout=1)
             
             print("[DEBUG] ❌ Login timeout - final check")
             final_url = driver.current_url
@@ -421,60 +780,43 @@ class TistoryPoster:
         """Post content to Tistory blog"""
         try:
             print("[DEBUG] Starting Tistory posting process...")
+            self.matched_selectors.clear()
             
             # Navigate to write page using the configured URL
             blog_url = f"{self.tistory_url}/manage/newpost/"
             print(f"[DEBUG] Navigating to: {blog_url}")
             driver.get(blog_url)
             
-            # Handle any alert that might pop up immediately
-            time.sleep(2)
-            try:
-                alert = driver.switch_to.alert
+            # Wait for the editor to load - or for the saved draft alert, which blocks the page
+            print("[DEBUG] Waiting for write page to load...")
+            editor_selector = "#post-title-inp, .CodeMirror, iframe#editor-tistory_ifr"
+            self.waiter.until(
+                driver, 'editor load',
+                lambda d: alert_present(d) or d.find_elements(By.CSS_SELECTOR, editor_selector),
+                timeout=15
+            )
+            
+            # The saved draft alert can open right after the editor appears
+            alert = self.waiter.alert(driver, 'draft alert', timeout=1)
+            if alert:
                 alert_text = alert.text
-                print(f"[DEBUG] Initial alert detected: {alert_text}")
-                alert.dismiss()  # Dismiss any initial alert
-                print("[DEBUG] Initial alert dismissed")
-            except:
-                print("[DEBUG] No initial alert found")
+                print(f"[DEBUG] Alert detected: {alert_text}")
+                
+                if "저장된 글이 있습니다" in alert_text or "이어서 작성하시겠습니까" in alert_text:
+                    print("[DEBUG] Found saved draft alert - dismissing to start fresh")
+                    alert.dismiss()  # Click "아니오" to start fresh
+                else:
+                    print("[DEBUG] Accepting alert")
+                    alert.accept()
+                print("[DEBUG] Alert handled successfully")
+            else:
+                print("[DEBUG] No alert found")
             
             print(f"[DEBUG] Current URL: {driver.current_url}")
             print(f"[DEBUG] Page title: {driver.title}")
             
-            # Wait for the page to load
-            print("[DEBUG] Waiting for write page to load...")
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            # Handle potential alert about saved draft - try multiple times
-            for attempt in range(3):
-                try:
-                    print(f"[DEBUG] Checking for alert (attempt {attempt + 1})")
-                    time.sleep(1)  # Wait a bit for alert to appear
-                    
-                    alert = driver.switch_to.alert
-                    alert_text = alert.text
-                    print(f"[DEBUG] Alert detected: {alert_text}")
-                    
-                    if "저장된 글이 있습니다" in alert_text or "이어서 작성하시겠습니까" in alert_text:
-                        print("[DEBUG] Found saved draft alert - dismissing to start fresh")
-                        alert.dismiss()  # Click "아니오" to start fresh
-                    else:
-                        print("[DEBUG] Accepting alert")
-                        alert.accept()
-                        
-                    print("[DEBUG] Alert handled successfully")
-                    break
-                except:
-                    print(f"[DEBUG] No alert found on attempt {attempt + 1}")
-                    if attempt == 2:
-                        print("[DEBUG] No alert found after 3 attempts")
-            
             # Wait for JavaScript to complete
-            WebDriverWait(driver, 15).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
+            self.waiter.document_ready(driver, 'editor ready')
             
             # Take screenshot of write page
             driver.save_screenshot("write_page.png")
@@ -482,7 +824,6 @@ class TistoryPoster:
             
             # Try different selectors for title input
             print("[DEBUG] Looking for title input field...")
-            title_input = None
             title_selectors = [
                 "#post-title-inp",
                 "input[placeholder='제목을 입력하세요']",
@@ -491,17 +832,7 @@ class TistoryPoster:
                 "input[name='title']", 
                 ".title-input"
             ]
-            
-            for selector in title_selectors:
-                try:
-                    title_input = WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    print(f"[DEBUG] Title input found using selector: {selector}")
-                    break
-                except TimeoutException:
-                    print(f"[DEBUG] Title selector {selector} not found, trying next...")
-                    continue
+            title_input = self._find_element(driver, 'editor:title', title_selectors)
             
             if not title_input:
                 print("[DEBUG] ❌ Title input not found")
@@ -516,31 +847,36 @@ class TistoryPoster:
             print("[DEBUG] Switching to Markdown mode...")
             try:
                 # Click editor mode button
-                editor_mode_btn = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "#editor-mode-layer-btn-open"))
+                editor_mode_btn = self.waiter.element(
+                    driver, 'editor mode button', (By.CSS_SELECTOR, "#editor-mode-layer-btn-open"),
+                    clickable=True, timeout=5
                 )
+                if not editor_mode_btn:
+                    raise WebDriverException("Editor mode button not found")
                 editor_mode_btn.click()
                 print("[DEBUG] Editor mode button clicked")
                 
                 # Wait for the layer to appear and click Markdown mode
-                markdown_mode_btn = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "#editor-mode-markdown"))
+                markdown_mode_btn = self.waiter.element(
+                    driver, 'markdown mode button', (By.CSS_SELECTOR, "#editor-mode-markdown"),
+                    clickable=True, timeout=5
                 )
+                if not markdown_mode_btn:
+                    raise WebDriverException("Markdown mode button not found")
                 markdown_mode_btn.click()
                 print("[DEBUG] Markdown mode button clicked")
                 
-                # Handle alert
-                try:
-                    alert = WebDriverWait(driver, 5).until(EC.alert_is_present())
-                    alert_text = alert.text
-                    print(f"[DEBUG] Alert detected: {alert_text}")
+                # The mode switch confirm opens right after the click, if at all
+                alert = self.waiter.alert(driver, 'markdown mode alert', timeout=1)
+                if alert:
+                    print(f"[DEBUG] Alert detected: {alert.text}")
                     alert.accept()
                     print("[DEBUG] Alert accepted")
-                except:
+                else:
                     print("[DEBUG] No alert found or alert already handled")
                 
                 # Wait for Markdown editor to load
-                time.sleep(2)
+                self.waiter.element(driver, 'markdown editor', (By.CSS_SELECTOR, ".CodeMirror"))
                 print("[DEBUG] Markdown editor mode activated")
                 
             except Exception as e:
@@ -551,7 +887,6 @@ class TistoryPoster:
             print("[DEBUG] Looking for content editor...")
             
             # Try different approaches for content editor
-            content_editor = None
             content_selectors = [
                 "#markdown-editor-container > div.mce-edit-area > div > div > div.CodeMirror-scroll > div.CodeMirror-sizer > div > div > div > div.CodeMirror-code > div > pre",
                 "#markdown-editor-container .CodeMirror-code pre",
@@ -566,17 +901,7 @@ class TistoryPoster:
                 "iframe[title='Rich Text Area']",
                 ".fr-element"
             ]
-            
-            for selector in content_selectors:
-                try:
-                    content_editor = WebDriverWait(driver, 5).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    print(f"[DEBUG] Content editor found using selector: {selector}")
-                    break
-                except TimeoutException:
-                    print(f"[DEBUG] Content selector {selector} not found, trying next...")
-                    continue
+            content_editor = self._find_element(driver, 'editor:content', content_selectors, timeout=5)
             
             if content_editor:
                 print(f"[DEBUG] Entering content...")
@@ -586,77 +911,74 @@ class TistoryPoster:
                     # Markdown editor with CodeMirror
                     try:
                         # Wait for CodeMirror to be ready
-                        time.sleep(3)
-                        
-                        # CodeMirror 내부의 실제 textarea 찾아서 send_keys로 입력
-                        textareas = driver.find_elements(By.CSS_SELECTOR, ".CodeMirror textarea")
-                        print(f"[DEBUG] Found {len(textareas)} textareas")
-                        
-                        editor = None
-                        for i, textarea in enumerate(textareas):
-                            print(f"[DEBUG] Checking textarea {i}: visible={textarea.is_displayed()}, enabled={textarea.is_enabled()}")
-                            if textarea.is_displayed() and textarea.is_enabled():
-                                editor = textarea
-                                print(f"[DEBUG] Using textarea {i}")
-                                break
-                        
-                        if not editor and textareas:
-                            editor = textareas[-1]  # 마지막 textarea 사용
-                            print(f"[DEBUG] Fallback to last textarea")
+                        self.waiter.until(
+                            driver, 'codemirror ready',
+                            lambda d: d.execute_script("var cm = document.querySelector('.CodeMirror'); return !!(cm && cm.CodeMirror);"),
+                            timeout=5
+                        )
                         
-                        if editor:
-                            # 스크롤하여 보이게 하기
-                            driver.execute_script("arguments[0].scrollIntoView(true);", editor)
-                            time.sleep(0.5)
+                        # Set the whole body in one call, then read it back - typing it key by key
+                        # is slow and CodeMirror's auto-indent rewrites list and quote lines
+                        if self._set_codemirror_value(driver, content):
+                            print("[DEBUG] Content entered into Markdown editor via CodeMirror setValue")
+                        else:
+                            print("[DEBUG] CodeMirror setValue unavailable, typing into the textarea")
+                            # CodeMirror 내부의 실제 textarea 찾아서 send_keys로 입력
+                            textareas = driver.find_elements(By.CSS_SELECTOR, ".CodeMirror textarea")
+                            print(f"[DEBUG] Found {len(textareas)} textareas")
                             
-                            # 클릭하여 포커스
-                            try:
-                                editor.click()
-                                time.sleep(0.5)
-                                print("[DEBUG] Textarea clicked successfully")
-                            except:
-                                print("[DEBUG] Click failed, trying to focus with JavaScript")
-                                driver.execute_script("arguments[0].focus();", editor)
-                                time.sleep(0.5)
+                            editor = None
+                            for i, textarea in enumerate(textareas):
+                                print(f"[DEBUG] Checking textarea {i}: visible={textarea.is_displayed()}, enabled={textarea.is_enabled()}")
+                                if textarea.is_displayed() and textarea.is_enabled():
+                                    editor = textarea
+                                    print(f"[DEBUG] Using textarea {i}")
+                                    break
                             
-                            # 마크다운 형태로 내용 입력
-                            editor.send_keys(content)
-                            print("[DEBUG] Content entered into Markdown editor via textarea")
-                        else:
-                            raise Exception("No suitable textarea found")
+                            if not editor and textareas:
+                                editor = textareas[-1]  # 마지막 textarea 사용
+                                print(f"[DEBUG] Fallback to last textarea")
+                            
+                            if editor:
+                                # 스크롤하여 보이게 하기
+                                driver.execute_script("arguments[0].scrollIntoView(true);", editor)
+                                
+                                # 클릭하여 포커스
+                                try:
+                                    editor.click()
+                                    print("[DEBUG] Textarea clicked successfully")
+                                except:
+                                    print("[DEBUG] Click failed, trying to focus with JavaScript")
+                                    driver.execute_script("arguments[0].focus();", editor)
+                                self.waiter.until(
+                                    driver, 'editor focus',
+                                    lambda d: d.execute_script("return document.activeElement === arguments[0];", editor),
+                                    timeout=2
+                                )
+                                
+                                # 마크다운 형태로 내용 입력
+                                editor.send_keys(content)
+                                print("[DEBUG] Content entered into Markdown editor via textarea")
+                            else:
+                                raise Exception("No suitable textarea found")
                         
                     except Exception as e:
-                        print(f"[DEBUG] Error with textarea approach: {e}")
-                        # Try JavaScript approach as fallback
+                        print(f"[DEBUG] Error with CodeMirror input: {e}")
+                        # Try direct send_keys as final fallback
                         try:
-                            # Use JavaScript to set content in CodeMirror
-                            driver.execute_script("""
-                                var editor = document.querySelector('.CodeMirror').CodeMirror;
-                                if (editor) {
-                                    editor.setValue(arguments[0]);
-                                    editor.refresh();
-                                }
-                            """, content)
-                            print("[DEBUG] Content entered into Markdown editor using JavaScript")
+                            # Scroll to element
+                            driver.execute_script("arguments[0].scrollIntoView(true);", content_editor)
+                            
+                            # Click to focus
+                            content_editor.click()
+                            
+                            # Try to clear and send keys
+                            content_editor.clear()
+                            content_editor.send_keys(content)
+                            print("[DEBUG] Content entered into Markdown editor via direct send_keys")
                         except Exception as e2:
-                            print(f"[DEBUG] Error with JavaScript approach: {e2}")
-                            # Try direct send_keys as final fallback
-                            try:
-                                # Scroll to element
-                                driver.execute_script("arguments[0].scrollIntoView(true);", content_editor)
-                                time.sleep(1)
-                                
-                                # Click to focus
-                                content_editor.click()
-                                time.sleep(1)
-                                
-                                # Try to clear and send keys
-                                content_editor.clear()
-                                content_editor.send_keys(content)
-                                print("[DEBUG] Content entered into Markdown editor via direct send_keys")
-                            except Exception as e3:
-                                print(f"[DEBUG] All approaches failed: {e3}")
-                                return False
+                            print(f"[DEBUG] All approaches failed: {e2}")
+                            return False
                 # Handle other editor types
                 elif content_editor.tag_name == "iframe" or content_editor.get_attribute("id") == "editor-tistory_ifr":
                     # Handle Tistory iframe specifically
@@ -691,112 +1013,78 @@ class TistoryPoster:
             if tags:
                 print(f"[DEBUG] Adding tags: {tags}")
                 tag_selectors = ["#tagText", "input[name='tag']", ".tag-input"]
-                
-                for selector in tag_selectors:
-                    try:
-                        tag_input = driver.find_element(By.CSS_SELECTOR, selector)
-                        tag_input.clear()
-                        tag_input.send_keys(tags)
-                        print(f"[DEBUG] Tags added using selector: {selector}")
-                        break
-                    except:
-                        print(f"[DEBUG] Tag selector {selector} not found, trying next...")
-                        continue
+                tag_input = self._find_element(driver, 'editor:tags', tag_selectors, timeout=2)
+                if tag_input:
+                    tag_input.clear()
+                    tag_input.send_keys(tags)
+                    print("[DEBUG] Tags added")
             
-            time.sleep(3)
+            # Let the editor finish reacting to the input (tag chips, autosave) before publishing
+            self.waiter.dom_stable(driver, 'editor settled', timeout=3)
 
             # Look for publish button
             print("[DEBUG] Looking for publish button...")
             publish_selectors = [
                 "#publish-layer-btn",
-                "button:contains('발행')",
-                "button:contains('게시')",
-                "button:contains('저장')",
                 "button[data-action='publish']",
                 ".btn-publish",
                 "button[type='submit']",
                 "input[type='submit']",
-                ".publish-btn"
+                ".publish-btn",
+                # Text matches last - '저장' also matches the draft save button
+                "button:contains('발행')",
+                "button:contains('게시')",
+                "button:contains('저장')"
             ]
-            
-            for selector in publish_selectors:
-                try:
-                    publish_btn = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    print(f"[DEBUG] Publish button found using selector: {selector}")
-                    publish_btn.click()
-                    print("[DEBUG] Publish button clicked")
-                    break
-                except:
-                    print(f"[DEBUG] Publish selector {selector} not found, trying next...")
-                    continue
-            else:
-                # Try XPath for text-based search
-                try:
-                    publish_btn = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), '발행') or contains(text(), '게시') or contains(text(), '저장')]"))
-                    )
-                    print("[DEBUG] Publish button found using XPath")
-                    publish_btn.click()
-                    print("[DEBUG] Publish button clicked")
-                except:
-                    print("[DEBUG] ❌ Publish button not found")
-                    return False
+            publish_btn = self._find_element(driver, 'editor:publish_layer_button', publish_selectors, clickable=True)
+            if not publish_btn:
+                print("[DEBUG] ❌ Publish button not found")
+                return False
+            publish_btn.click()
+            print("[DEBUG] Publish button clicked")
             
             # Wait for publish layer to appear
             print("[DEBUG] Waiting for publish layer to appear...")
-            time.sleep(2)
+            self.waiter.element(driver, 'publish layer', (By.CSS_SELECTOR, "#publish-btn"), clickable=True)
             
             # Set post to public (공개)
-            try:
-                print("[DEBUG] Setting post to public...")
-                public_radio = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "input[type='radio'][id='open20'][value='20']"))
-                )
+            print("[DEBUG] Setting post to public...")
+            public_radio = self._find_element(
+                driver, 'publish:public_radio',
+                ["input[type='radio'][id='open20'][value='20']", "input[name='basicSet'][value='20']"],
+                clickable=True
+            )
+            if public_radio:
                 public_radio.click()
                 print("[DEBUG] Public radio button clicked")
-            except Exception as e:
-                print(f"[DEBUG] Could not find public radio button: {e}")
-                # Try alternative selector
-                try:
-                    public_radio = WebDriverWait(driver, 5).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "input[name='basicSet'][value='20']"))
-                    )
-                    public_radio.click()
-                    print("[DEBUG] Public radio button clicked (alternative selector)")
-                except:
-                    print("[DEBUG] ❌ Could not set post to public")
+            else:
+                print("[DEBUG] ❌ Could not set post to public")
+            
+            # Count the save request the final button sends, so the confirmation wait can end with it
+            editor_url = driver.current_url
+            self.waiter.track_network(driver)
             
             # Click final publish button
-            try:
-                print("[DEBUG] Looking for final publish button...")
-                final_publish_btn = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "#publish-btn"))
-                )
-                final_publish_btn.click()
-                print("[DEBUG] Final publish button clicked")
-            except Exception as e:
-                print(f"[DEBUG] Could not find final publish button: {e}")
-                # Try alternative selectors
-                try:
-                    final_publish_btn = WebDriverWait(driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), '공개 발행')]"))
-                    )
-                    final_publish_btn.click()
-                    print("[DEBUG] Final publish button clicked (XPath)")
-                except:
-                    print("[DEBUG] ❌ Could not find final publish button")
-                    return False
+            print("[DEBUG] Looking for final publish button...")
+            final_publish_btn = self._find_element(
+                driver, 'publish:final_button', ["#publish-btn", "//button[contains(text(), '공개 발행')]"], clickable=True
+            )
+            if not final_publish_btn:
+                print("[DEBUG] ❌ Could not find final publish button")
+                return False
+            final_publish_btn.click()
+            print("[DEBUG] Final publish button clicked")
             
             # Wait for confirmation or success message
             print("[DEBUG] Waiting for post confirmation...")
-            time.sleep(5)
+            self.waiter.network_idle(driver, 'post confirmation', timeout=10, old_url=editor_url)
             
             # Take screenshot of result
             driver.save_screenshot("post_result.png")
             print("[DEBUG] Post result screenshot saved as post_result.png")
             
+            self._remember_selectors('editor:')
+            self._remember_selectors('publish:')
             print("[DEBUG] ✅ Post completed successfully")
             return True
             
@@ -858,5 +1146,282 @@ def test_tistory_poster():
     print("Tistory poster test completed!")
 
 
+_MOCK_EDITOR_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>글쓰기</title></head>
+<body>
+<input id="post-title-inp" placeholder="제목을 입력하세요">
+<button id="editor-mode-layer-btn-open">기본모드</button>
+<button id="editor-mode-markdown" onclick="confirm('마크다운 모드로 전환하시겠습니까?')">마크다운</button>
+<div id="markdown-editor-container"><div class="CodeMirror"><textarea></textarea>
+<div class="CodeMirror-code"><div><pre> </pre></div></div></div></div>
+<input id="tagText">
+<button id="publish-layer-btn" onclick="document.getElementById('layer').style.display='block'">완료</button>
+<div id="layer" style="display:none">
+<input type="radio" id="open20" name="basicSet" value="20">
+<button id="publish-btn" onclick="publish()">공개 발행</button>
+</div>
+<script>
+// Minimal stand-in for the CodeMirror instance the real editor attaches to .CodeMirror
+var codeMirrorTextarea = document.querySelector('.CodeMirror textarea');
+document.querySelector('.CodeMirror').CodeMirror = {
+    setValue: function(value) { codeMirrorTextarea.value = value; },
+    getValue: function() { return codeMirrorTextarea.value; },
+    refresh: function() {}
+};
+function publish() {
+    fetch('/manage/post.json', {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify({
+        id: '0', title: document.getElementById('post-title-inp').value,
+        content: document.querySelector('.CodeMirror textarea').value,
+        tag: document.getElementById('tagText').value, visibility: 20, published: 1, type: 'post'
+    })});
+}
+</script>
+</body></html>"""
+
+
+class _MockTistoryHandler(BaseHTTPRequestHandler):
+    """Local stand-in for a Tistory blog: session check, the editor page and the post save endpoint"""
+    session_cookie = 'TSSESSION=mock-session'
+    delay = 0.05
+    # Titles starting with these get a slow response after the post is saved / a 500 / a 400 before it is
+    slow_prefix = '지연'
+    error_prefix = '오류'
+    invalid_prefix = '거부'
+    posts = []
+    lock = threading.Lock()
+    
+    def _logged_in(self):
+        return self.session_cookie in self.headers.get('Cookie', '')
+    
+    def _send(self, status, body, content_type='text/html; charset=utf-8', headers=None):
+        body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client already gave up (slow response test)
+    
+    def do_GET(self):
+        if self.path.startswith('/manage') and not self._logged_in():
+            self._send(302, '', headers={'Location': f'/auth/login?redirectUrl={self.path}'})
+        elif self.path.startswith('/manage/newpost'):
+            self._send(200, _MOCK_EDITOR_PAGE)
+        elif self.path.startswith('/rss'):
+            with self.lock:
+                items = ''.join(
+                    f"<item><title>{escape(post['title'])}</title><link>http://{self.headers['Host']}/{i}</link></item>"
+                    for i, post in enumerate(_MockTistoryHandler.posts, 1)
+                )
+            self._send(200, f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>{items}</channel></rss>',
+                       'application/rss+xml; charset=utf-8')
+        else:
+            self._send(200, '<html><body>mock tistory</body></html>')
+    
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        if self.path != '/manage/post.json' or not self._logged_in():
+            self._send(302, '', headers={'Location': '/auth/login'})
+            return
+        
+        if request.get('title', '').startswith(self.error_prefix):
+            self._send(500, 'Internal Server Error')
+            return
+        if request.get('title', '').startswith(self.invalid_prefix):
+            self._send(400, json.dumps({'error': 'invalid request'}), 'application/json')
+            return
+        
+        time.sleep(self.delay)
+        with self.lock:
+            _MockTistoryHandler.posts.append(request)
+            entry_id = len(_MockTistoryHandler.posts)
+        if request.get('title', '').startswith(self.slow_prefix):
+            time.sleep(1)  # Saved, but the client times out before the response
+        self._send(200, json.dumps({'entryUrl': f"http://{self.headers['Host']}/{entry_id}"}),
+                   'application/json')
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def _mock_blog_poster(blog_url):
+    """Create a TistoryPoster for the mock blog without leaving its settings in os.environ"""
+    with override_environ(TISTORY_USERNAME='mock', TISTORY_PASSWORD='mock', TISTORY_URL=blog_url):
+        return TistoryPoster()
+
+
+def benchmark_publish_backends(num_posts=3):
+    """Compare per-post publish latency of the HTTP backend and the Selenium editor on a mock blog"""
+    import tempfile
+    
+    print(f"Benchmarking publish backends ({num_posts} posts each)...")
+    server, blog_url = start_stub_server(_MockTistoryHandler)
+    
+    content = "## 테스트 포스트\n\n이것은 **테스트** 포스트입니다.\n\n- 항목 1\n- 항목 2\n\n> 인용문"
+    cookie_name, cookie_value = _MockTistoryHandler.session_cookie.split('=')
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        poster = _mock_blog_poster(blog_url)
+        poster.cookies_file = os.path.join(tmp_dir, 'tistory_cookies.json')
+        poster.selector_cache_file = os.path.join(tmp_dir, 'poster_selectors.json')
+        with open(poster.cookies_file, 'w', encoding='utf-8') as f:
+            json.dump([{'name': cookie_name, 'value': cookie_value}], f)
+        
+        try:
+            # HTTP backend with the saved session cookies, no browser
+            for i in range(num_posts):
+                start_time = time.time()
+                outcome, entry_url = poster.post_via_http(f"HTTP 테스트 {i}", content, "테스트, 자동포스팅")
+                poster.publish_stats['http'].append(time.time() - start_time)
+                print(f"HTTP post {i}: {outcome} {entry_url}")
+            
+            driver = None
+            try:
+                driver = poster.setup_chrome_driver()
+                driver.get(f"{blog_url}/robots.txt")
+                driver.add_cookie({'name': cookie_name, 'value': cookie_value})
+                for i in range(num_posts):
+                    start_time = time.time()
+                    success = poster.post_to_tistory(driver, f"Selenium 테스트 {i}", content, "테스트, 자동포스팅")
+                    poster.publish_stats['selenium'].append(time.time() - start_time)
+                    print(f"Selenium post {i}: {success}")
+            except Exception as e:
+                print(f"Selenium backend skipped: {e}")
+            finally:
+                if driver:
+                    driver.quit()
+        finally:
+            server.shutdown()
+        
+        print(f"\nPosts received by mock server: {len(_MockTistoryHandler.posts)}")
+        poster.print_publish_stats()
+        poster.waiter.print_stats()
+        poster.print_selector_stats()
+        http_latencies, selenium_latencies = poster.publish_stats['http'], poster.publish_stats['selenium']
+        if http_latencies and selenium_latencies:
+            speedup = (sum(selenium_latencies) / len(selenium_latencies)) / (sum(http_latencies) / len(http_latencies))
+            print(f"HTTP backend is {speedup:.0f}x faster per post")
+
+
+def test_http_publish():
+    """Test HTTP publish outcomes against the mock blog, and the markdown the generator emits"""
+    import tempfile
+    
+    print("Testing HTTP publishing against mock server...")
+    server, blog_url = start_stub_server(_MockTistoryHandler)
+    
+    content = """## 청년 주거 지원 확대
+
+정부가 **청년 월세 지원** 대상을 넓힙니다. 자세한 내용은 [정책브리핑](https://www.korea.kr)에서 확인하세요.
+
+### 주요 내용
+
+- 지원 대상: 중위소득 100% 이하
+    - 기존 60%에서 확대
+- 지원 기간: 24개월
+
+1. 온라인 신청
+2. 서류 심사
+
+| 구분 | 기존 | 변경 |
+|------|------|------|
+| 기간 | 12개월 | 24개월 |
+
+```
+신청: 복지로 누리집
+```
+
+> 국무회의 의결 사항입니다."""
+    cookie_name, cookie_value = _MockTistoryHandler.session_cookie.split('=')
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        poster = _mock_blog_poster(blog_url)
+        poster.cookies_file = os.path.join(tmp_dir, 'tistory_cookies.json')
+        poster.http_timeout = 0.5
+        
+        html = poster._render_markdown(content)
+        for tag in ('<h2>', '<h3>', '<strong>', '<a href=', '<li>기존 60%에서 확대</li>', '<ol>', '<table>', '<pre><code>', '<blockquote>'):
+            print(f"Markdown renders {tag}: {tag in html}")
+        
+        def save_cookie(value):
+            with open(poster.cookies_file, 'w', encoding='utf-8') as f:
+                json.dump([{'name': cookie_name, 'value': value}], f)
+        
+        try:
+            save_cookie(cookie_value)
+            print(f"Normal post: {poster.post_via_http('정상 테스트', content, '테스트')[0]} (should be created)")
+            print(f"Server error: {poster.post_via_http('오류 테스트', content, '')[0]} (should be unknown)")
+            print(f"Rejected request: {poster.post_via_http('거부 테스트', content, '')[0]} (should be not_created)")
+            
+            # Saved but the response times out - publish() must find it in the feed instead of re-posting
+            posts_before = len(_MockTistoryHandler.posts)
+            print(f"Slow response: {poster.post_via_http('지연 테스트 1', content, '')[0]} (should be unknown)")
+            print(f"publish() after slow response: {poster.publish(None, '지연 테스트 2', content, '')} (should be created)")
+            print(f"Posts created: {len(_MockTistoryHandler.posts) - posts_before} (should be 2)")
+            
+            save_cookie('expired')
+            print(f"Expired session: {poster.post_via_http('만료 테스트', content, '')[0]} (should be not_created)")
+            
+            poster.tistory_url = 'http://127.0.0.1:1'
+            print(f"Connection refused: {poster.post_via_http('연결 테스트', content, '')[0]} (should be not_created)")
+        finally:
+            server.shutdown()
+    
+    print("\nHTTP publish test completed!")
+
+
+def benchmark_content_injection(lengths=(300, 1200, 5000)):
+    """Compare CodeMirror setValue with send_keys for entering markdown bodies of increasing length"""
+    print("Benchmarking content injection into the mock markdown editor...")
+    server, blog_url = start_stub_server(_MockTistoryHandler)
+    
+    paragraph = "## 정책 요약\n\n- 청년 월세 지원 대상 확대\n- 지원 기간 **24개월**로 연장\n\n> 국무회의 의결 사항입니다.\n\n"
+    cookie_name, cookie_value = _MockTistoryHandler.session_cookie.split('=')
+    poster = _mock_blog_poster(blog_url)
+    driver = None
+    
+    try:
+        driver = poster.setup_chrome_driver()
+        driver.get(f"{blog_url}/robots.txt")
+        driver.add_cookie({'name': cookie_name, 'value': cookie_value})
+        driver.get(f"{blog_url}/manage/newpost/")
+        textarea = driver.find_element(By.CSS_SELECTOR, ".CodeMirror textarea")
+        
+        print(f"{'chars':>7}  {'setValue':>9}  {'send_keys':>9}  read-back")
+        for length in lengths:
+            content = (paragraph * (length // len(paragraph) + 1))[:length]
+            
+            start_time = time.time()
+            verified = poster._set_codemirror_value(driver, content)
+            set_value_time = time.time() - start_time
+            
+            textarea.clear()
+            start_time = time.time()
+            textarea.send_keys(content)
+            send_keys_time = time.time() - start_time
+            
+            print(f"{length:>7}  {set_value_time:>8.3f}s  {send_keys_time:>8.3f}s  {'ok' if verified else 'MISMATCH'}")
+    except Exception as e:
+        print(f"Content injection benchmark skipped: {e}")
+    finally:
+        if driver:
+            driver.quit()
+        server.shutdown()
+
+
 if __name__ == "__main__":
-    test_tistory_poster()
\ No newline at end of file
+    import sys
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        benchmark_publish_backends()
+    elif len(sys.argv) > 1 and sys.argv[1] == "http":
+        test_http_publish()
+    elif len(sys.argv) > 1 and sys.argv[1] == "inject":
+        benchmark_content_injection()
+    else:
+        test_tistory_poster()
\ No newline at end of file
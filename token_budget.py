@@ -0,0 +1,76 @@
+import re
+
+# tiktoken is optional; without it (or without its downloaded encoding files) token counts are estimated
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+class TokenCounter:
+    def __init__(self, model="gpt-3.5-turbo"):
+        self.model = model
+        self.encoding = None
+        
+        if tiktoken:
+            try:
+                try:
+                    self.encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    self.encoding = tiktoken.get_encoding('cl100k_base')
+            except Exception as e:
+                print(f"[DEBUG] Could not load tiktoken encoding, estimating token counts: {e}")
+        
+        self.name = f"tiktoken/{self.encoding.name}" if self.encoding else "estimate"
+    
+    def count(self, text):
+        """Count tokens in text"""
+        if not text:
+            return 0
+        if self.encoding:
+            return len(self.encoding.encode(text))
+        # cl100k spends roughly one token per Hangul syllable and one per ~4 ASCII characters
+        ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+        return (len(text) - ascii_chars) + (ascii_chars + 3) // 4
+    
+    def count_messages(self, messages):
+        """Count prompt tokens for chat messages, including per-message overhead"""
+        return sum(4 + self.count(message['content']) for message in messages) + 3
+    
+    def _truncate(self, text, max_tokens):
+        """Cut text to at most max_tokens, ignoring sentence boundaries"""
+        if self.encoding:
+            return self.encoding.decode(self.encoding.encode(text)[:max_tokens])
+        
+        # Shrink proportionally until the estimate fits
+        while text and self.count(text) > max_tokens:
+            text = text[:int(len(text) * max_tokens / self.count(text))]
+        return text
+    
+    def trim_to_budget(self, text, max_tokens):
+        """Trim text to at most max_tokens, cutting at sentence boundaries where possible"""
+        if max_tokens <= 0:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+        
+        sentences = re.split(r'(?<=[.!?。])\s+', text)
+        kept = []
+        used = 0
+        for sentence in sentences:
+            sentence_tokens = self.count(sentence) + 1  # + joining space
+            if used + sentence_tokens > max_tokens:
+                break
+            kept.append(sentence)
+            used += sentence_tokens
+        
+        if not kept:
+            # A single sentence longer than the whole budget
+            return self._truncate(text, max_tokens)
+        
+        trimmed = ' '.join(kept)
+        # Counts of separate sentences can be off by a token or two at the joins
+        while len(kept) > 1 and self.count(trimmed) > max_tokens:
+            kept.pop()
+            trimmed = ' '.join(kept)
+        return trimmed